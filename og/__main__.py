@@ -63,10 +63,21 @@ async def _run(config: Config, message: str | None, session_id: str) -> None:
             channel = CLIChannel()
             await interactive_loop(agent, channel, session_id)
     finally:
+        await agent.drain()
+        await agent.budget.flush()
         if agent.pool is not None:
             await agent.pool.close()
 
 
+def _install_uvloop() -> None:
+    """Use uvloop for every asyncio.run in this process when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
+
+
 class DefaultGroup(click.Group):
     """Falls through to 'chat' when no subcommand matches."""
 
@@ -86,6 +97,7 @@ class DefaultGroup(click.Group):
 @click.group(cls=DefaultGroup)
 def main():
     """OG — OpenClaw Python PoC agent."""
+    _install_uvloop()
 
 
 @main.command()
@@ -111,11 +123,11 @@ def chat(message: str | None, session: str | None, model: str | None) -> None:
 @click.option("--limit", "-n", default=10, help="Max results")
 def recall(query: str, project: str | None, entity: tuple[str, ...], limit: int) -> None:
     """Search stored knowledge for relevant context."""
-    from og.cli.hooks import recall_impl
+    from og.cli.hooks import recall_impl, run_hook
 
     entities = list(entity) if entity else None
     result = asyncio.run(
-        recall_impl(query, project_id=project or "", entities=entities, limit=limit)
+        run_hook(recall_impl(query, project_id=project or "", entities=entities, limit=limit))
     )
     if result:
         click.echo(result)
@@ -127,9 +139,11 @@ def recall(query: str, project: str | None, entity: tuple[str, ...], limit: int)
 @click.option("--project", "-p", default=None, help="Project ID override")
 def extract(transcript_file: str, session_id: str | None, project: str | None) -> None:
     """Extract knowledge from a Claude Code transcript."""
-    from og.cli.hooks import extract_impl
+    from og.cli.hooks import extract_impl, run_hook
 
-    result = asyncio.run(extract_impl(transcript_file, session_id=session_id, project_id=project))
+    result = asyncio.run(
+        run_hook(extract_impl(transcript_file, session_id=session_id, project_id=project))
+    )
     click.echo(result)
 
 
@@ -138,9 +152,9 @@ def extract(transcript_file: str, session_id: str | None, project: str | None) -
 @click.option("--limit", "-n", default=20, help="Max chunks to inject")
 def inject(project: str | None, limit: int) -> None:
     """Inject stored context (decisions, constraints, patterns, corrections)."""
-    from og.cli.hooks import inject_impl
+    from og.cli.hooks import inject_impl, run_hook
 
-    result = asyncio.run(inject_impl(project_id=project, limit=limit))
+    result = asyncio.run(run_hook(inject_impl(project_id=project, limit=limit)))
     if result:
         click.echo(result)
 
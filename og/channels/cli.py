@@ -15,22 +15,22 @@ from og.channels.base import Channel
 class CLIChannel(Channel):
     """Terminal UI channel using Rich for formatted output."""
 
+    EXIT_COMMANDS = frozenset({"exit", "quit", "/quit", "/exit"})
+    _EXIT_MAX_LEN = max(map(len, EXIT_COMMANDS))
+
     def __init__(self):
         self.console = Console()
         self._stream_buffer: list[str] = []
 
     async def receive(self) -> str | None:
-        self.console.print()
+        sys.stdout.write("\n")
         try:
             # Run input in a thread to not block the event loop
-            message = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.console.input("[bold cyan]you>[/bold cyan] "),
-            )
+            message = await asyncio.to_thread(self.console.input, "[bold cyan]you>[/bold cyan] ")
         except (EOFError, KeyboardInterrupt):
             return None
         message = message.strip()
-        if message.lower() in ("exit", "quit", "/quit", "/exit"):
+        if len(message) <= self._EXIT_MAX_LEN and message.lower() in self.EXIT_COMMANDS:
             return None
         return message if message else ""
 
@@ -41,7 +41,7 @@ class CLIChannel(Channel):
 
     async def stream(self, chunk: str) -> None:
         self._stream_buffer.append(chunk)
-        # Print raw chunks for real-time feel
+        # Chunks arrive already batched by the agent (llm.stream_batch_*): write each as-is
         sys.stdout.write(chunk)
         sys.stdout.flush()
 
@@ -51,7 +51,12 @@ class CLIChannel(Channel):
         sys.stdout.flush()
 
     async def show_status(self, status: str) -> None:
-        self.console.print(f"  [dim]{status}[/dim]", end="\r")
+        # Plain writes: this line is redrawn often and needs none of Rich's rendering
+        if self.console.is_terminal:
+            sys.stdout.write(f"\x1b[2K\r  \x1b[2m{status}\x1b[0m\r")
+        else:
+            sys.stdout.write(f"  {status}\r")
+        sys.stdout.flush()
 
     def print_welcome(self, session_id: str) -> None:
         self.console.print(
@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import io
 import logging
 from pathlib import Path
 
@@ -11,30 +14,87 @@ from og.config.schema import Config
 
 logger = logging.getLogger(__name__)
 
+_POOL = None
+_POOL_LOOP: asyncio.AbstractEventLoop | None = None
+
+INJECT_HEADER = "# \U0001f7e2 OG Active — Recalled Context\n\n"
+
+# Injected chunk types, in the order their sections are rendered
+INJECT_LABELS = {
+    "decision": "Decisions",
+    "constraint": "Constraints",
+    "pattern": "Patterns",
+    "correction": "Corrections",
+}
+
+# $1 is NULL to inject across all projects.
 INJECT_SQL = """
 SELECT chunk_type, text FROM context_chunks
-WHERE project_id = $1 AND chunk_type IN ('decision', 'constraint', 'pattern', 'correction')
+WHERE ($1::text IS NULL OR project_id = $1)
+  AND chunk_type IN ('decision', 'constraint', 'pattern', 'correction')
 ORDER BY created_at DESC LIMIT $2;
 """
 
-INJECT_ALL_SQL = """
-SELECT chunk_type, text FROM context_chunks
-WHERE chunk_type IN ('decision', 'constraint', 'pattern', 'correction')
-ORDER BY created_at DESC LIMIT $1;
-"""
+
+@functools.lru_cache(maxsize=1)
+def _get_config() -> Config:
+    """Load .env and build the Config once per process."""
+    load_dotenv()
+    return Config()
 
 
 async def create_pool(config: Config):
-    """Create a lightweight asyncpg connection pool for hook subcommands."""
+    """Create a lightweight asyncpg connection pool for hook subcommands.
+
+    Hook queries are not prepared up front: asyncpg's per-connection statement cache
+    prepares each SQL string on first use and reuses it for as long as the shared pool
+    (see _get_pool) keeps the connection open. Preparing in an ``init`` callback would
+    only add a round trip for the one-shot hook processes.
+    """
     import asyncpg
+    from pgvector.asyncpg import register_vector
+
+    from og.knowledge.graph import AGE_SERVER_SETTINGS, load_age
+
+    async def init_conn(conn: asyncpg.Connection) -> None:
+        await register_vector(conn)
+        await load_age(conn)
 
     return await asyncpg.create_pool(
         dsn=config.db.dsn,
         min_size=1,
         max_size=3,
+        init=init_conn,
+        server_settings=AGE_SERVER_SETTINGS,
     )
 
 
+async def _get_pool(config: Config):
+    """Return the process-wide hook pool, creating it on first use in this event loop."""
+    global _POOL, _POOL_LOOP
+    loop = asyncio.get_running_loop()
+    if _POOL is None or _POOL_LOOP is not loop:
+        _POOL = await create_pool(config)
+        _POOL_LOOP = loop
+    return _POOL
+
+
+async def close_pool() -> None:
+    """Close the shared hook pool if one was opened."""
+    global _POOL, _POOL_LOOP
+    pool, _POOL, _POOL_LOOP = _POOL, None, None
+    if pool is not None:
+        await pool.close()
+
+
+async def run_hook(coro):
+    """Await a hook coroutine, then release the shared pool before the loop shuts down."""
+    try:
+        return await coro
+    finally:
+        await close_pool()
+
+
 async def recall_impl(
     query: str,
     project_id: str,
@@ -42,35 +102,42 @@ async def recall_impl(
     limit: int = 10,
 ) -> str:
     """Search memory for relevant context chunks. Falls back to flat-file Memory."""
-    load_dotenv()
-    config = Config()
-    if project_id:
-        config.memory.project_id = project_id
+    config = _get_config()
+    proj = project_id or config.memory.project_id
 
     # Try PG-backed search first
     try:
-        pool = await create_pool(config)
-        try:
-            from og.memory.embeddings import EmbeddingClient
-            from og.memory.pg import PgMemory
-
-            embedder = EmbeddingClient(
-                base_url=config.embedding.ollama_base_url,
-                model=config.embedding.model,
-            )
-
-            graph = None
-            if entities:
-                from og.knowledge.graph import KnowledgeGraph
-
-                graph = KnowledgeGraph(pool, config.memory.project_id)
-
-            pg_mem = PgMemory(pool, embedder, config.memory.project_id, graph=graph)
-            results = await pg_mem.search(query, limit=limit, entities=entities)
-            if results:
-                return "\n".join(f"- {text}" for text in results)
-        finally:
-            await pool.close()
+        pool = await _get_pool(config)
+
+        from og.memory.embeddings import EmbeddingClient
+        from og.memory.pg import PgMemory
+
+        embedder = EmbeddingClient(
+            base_url=config.embedding.ollama_base_url,
+            model=config.embedding.model,
+            concurrency=config.embedding.concurrency,
+            batch_chunk_size=config.embedding.batch_chunk_size,
+        )
+
+        graph = None
+        if entities:
+            from og.knowledge.graph import KnowledgeGraph
+
+            graph = KnowledgeGraph(pool, proj)
+
+        pg_mem = PgMemory(
+            pool,
+            embedder,
+            proj,
+            graph=graph,
+            keyword_index=config.db.keyword_index,
+            fts_config=config.db.fts_config,
+            semantic_index=config.db.semantic_index,
+            embed_timeout=config.embedding.query_timeout,
+        )
+        results = await pg_mem.search(query, limit=limit, entities=entities)
+        if results:
+            return "\n".join(f"- {text}" for text in results)
     except Exception:
         logger.debug("PG recall failed, falling back to flat-file", exc_info=True)
 
@@ -91,37 +158,36 @@ async def extract_impl(
     project_id: str | None = None,
 ) -> str:
     """Parse a transcript and extract knowledge into PG. Returns summary."""
-    load_dotenv()
-    config = Config()
+    config = _get_config()
     proj = project_id or config.memory.project_id
     sid = session_id or "unknown"
 
     from og.cli.transcript import parse_transcript
 
-    conversation_text = parse_transcript(transcript_path)
+    conversation_text = await asyncio.to_thread(parse_transcript, transcript_path)
     if not conversation_text:
         return "No conversation content found."
 
     try:
-        pool = await create_pool(config)
-        try:
-            from og.knowledge.extractor import KnowledgeExtractor
-            from og.knowledge.graph import KnowledgeGraph
-            from og.knowledge.hooks import PreCompactHook
-            from og.memory.embeddings import EmbeddingClient
-
-            embedder = EmbeddingClient(
-                base_url=config.embedding.ollama_base_url,
-                model=config.embedding.model,
-            )
-            extractor = KnowledgeExtractor()
-            graph = KnowledgeGraph(pool, proj)
-
-            hook = PreCompactHook(pool, embedder, extractor, graph, proj)
-            count = await hook.run(sid, conversation_text)
-            return f"Extracted {count} chunks."
-        finally:
-            await pool.close()
+        pool = await _get_pool(config)
+
+        from og.knowledge.extractor import KnowledgeExtractor
+        from og.knowledge.graph import KnowledgeGraph
+        from og.knowledge.hooks import PreCompactHook
+        from og.memory.embeddings import EmbeddingClient
+
+        embedder = EmbeddingClient(
+            base_url=config.embedding.ollama_base_url,
+            model=config.embedding.model,
+            concurrency=config.embedding.concurrency,
+            batch_chunk_size=config.embedding.batch_chunk_size,
+        )
+        extractor = KnowledgeExtractor()
+        graph = KnowledgeGraph(pool, proj)
+
+        hook = PreCompactHook(pool, embedder, extractor, graph, proj)
+        count = await hook.run(sid, conversation_text)
+        return f"Extracted {count} chunks."
     except Exception:
         logger.warning("extract_impl failed", exc_info=True)
         return "Extraction failed (DB unavailable)."
@@ -132,22 +198,15 @@ async def inject_impl(
     limit: int = 20,
 ) -> str:
     """Fetch high-value context chunks and format for injection into Claude context."""
-    load_dotenv()
-    config = Config()
+    config = _get_config()
     proj = project_id
 
     # Try PG-backed injection
     try:
-        pool = await create_pool(config)
-        try:
-            if proj:
-                rows = await pool.fetch(INJECT_SQL, proj, limit)
-            else:
-                rows = await pool.fetch(INJECT_ALL_SQL, limit)
-            if rows:
-                return _format_inject_rows(rows)
-        finally:
-            await pool.close()
+        pool = await _get_pool(config)
+        rows = await pool.fetch(INJECT_SQL, proj or None, limit)
+        if rows:
+            return _format_inject_rows(rows)
     except Exception:
         logger.debug("PG inject failed, falling back to flat-file", exc_info=True)
 
@@ -156,34 +215,27 @@ async def inject_impl(
     if memory_path.exists():
         content = memory_path.read_text(encoding="utf-8").strip()
         if content:
-            return f"# \U0001f7e2 OG Active — Recalled Context\n\n{content}"
+            return INJECT_HEADER + content
 
     return ""
 
 
 def _format_inject_rows(rows) -> str:
     """Group chunks by type and format as markdown sections."""
-    groups: dict[str, list[str]] = {}
-    for row in rows:
-        chunk_type = row["chunk_type"]
-        groups.setdefault(chunk_type, []).append(row["text"])
-
-    type_labels = {
-        "decision": "Decisions",
-        "constraint": "Constraints",
-        "pattern": "Patterns",
-        "correction": "Corrections",
-    }
-
-    sections = []
-    for ctype in ("decision", "constraint", "pattern", "correction"):
-        items = groups.get(ctype, [])
-        if items:
-            label = type_labels.get(ctype, ctype.capitalize())
-            bullets = "\n".join(f"- {text}" for text in items)
-            sections.append(f"## {label}\n\n{bullets}")
-
-    if not sections:
-        return ""
-
-    return "# \U0001f7e2 OG Active — Recalled Context\n\n" + "\n\n".join(sections)
+    groups: dict[str, list[str]] = {ctype: [] for ctype in INJECT_LABELS}
+    # INJECT_SQL selects (chunk_type, text) in that order
+    for chunk_type, text in rows:
+        try:
+            groups[chunk_type].append(text)
+        except KeyError:
+            continue
+
+    buf = io.StringIO()
+    for ctype, items in groups.items():
+        if not items:
+            continue
+        buf.write("\n\n" if buf.tell() else INJECT_HEADER)
+        buf.write(f"## {INJECT_LABELS[ctype]}\n\n")
+        buf.write("\n".join(f"- {text}" for text in items))
+
+    return buf.getvalue()
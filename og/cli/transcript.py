@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-import json
+import io
 import logging
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,42 +25,45 @@ def parse_transcript(path: str | Path, max_chars: int = 16000) -> str:
         logger.warning("Transcript not found: %s", path)
         return ""
 
-    lines: list[str] = []
-    total_chars = 0
+    buf = io.StringIO()
 
-    for raw_line in path.read_text(encoding="utf-8").splitlines():
-        raw_line = raw_line.strip()
-        if not raw_line:
-            continue
+    with path.open("rb") as f:
+        for raw_line in f:
+            raw_line = raw_line.strip()
+            if not raw_line:
+                continue
+            # Cheap byte scan: a chat line must carry one of these role values, so
+            # tool/summary/system entries are skipped without being parsed.
+            if b'"user"' not in raw_line and b'"assistant"' not in raw_line:
+                continue
 
-        try:
-            entry = json.loads(raw_line)
-        except json.JSONDecodeError:
-            continue
+            try:
+                entry = orjson.loads(raw_line)
+            except orjson.JSONDecodeError:
+                continue
 
-        msg = entry.get("message")
-        if not msg:
-            continue
+            msg = entry.get("message")
+            if not msg:
+                continue
 
-        role = msg.get("role", "")
-        if role not in ("user", "assistant"):
-            continue
+            role = msg.get("role", "")
+            if role not in ("user", "assistant"):
+                continue
 
-        content = msg.get("content", "")
-        text = _extract_text(content)
-        if not text:
-            continue
+            content = msg.get("content", "")
+            text = _extract_text(content)
+            if not text:
+                continue
 
-        prefix = "User" if role == "user" else "Assistant"
-        line = f"{prefix}: {text}"
-        lines.append(line)
-        total_chars += len(line)
+            if buf.tell():
+                buf.write("\n\n")
+            buf.write("User: " if role == "user" else "Assistant: ")
+            buf.write(text)
 
-        if total_chars >= max_chars:
-            break
+            if buf.tell() >= max_chars:
+                break
 
-    result = "\n\n".join(lines)
-    return result[:max_chars]
+    return buf.getvalue()[:max_chars]
 
 
 def _extract_text(content: str | list) -> str:
@@ -67,10 +72,8 @@ def _extract_text(content: str | list) -> str:
         return content.strip()
 
     if isinstance(content, list):
-        parts = []
-        for block in content:
-            if isinstance(block, dict) and block.get("type") == "text":
-                parts.append(block.get("text", ""))
-        return " ".join(parts).strip()
+        return " ".join(
+            [b.get("text", "") for b in content if type(b) is dict and b.get("type") == "text"]
+        ).strip()
 
     return ""
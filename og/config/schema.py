@@ -1,8 +1,9 @@
 """Configuration schema with Pydantic BaseSettings."""
 
+import os
 from pathlib import Path
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,11 +12,14 @@ class LLMConfig(BaseModel):
     max_tokens: int = 4096
     temperature: float = 0.7
     budget_limit: float = 5.00  # USD spending cap
+    stream_batch_chars: int = 64  # max characters coalesced per streamed chunk
+    stream_batch_ms: int = 20  # a partial batch is released by the next delta after this
 
 
 class SessionConfig(BaseModel):
-    storage_dir: Path = Path.home() / ".og" / "sessions"
+    storage_dir: Path = Field(default_factory=lambda: Path.home() / ".og" / "sessions")
     default_session: str = "default"
+    backend: str = "jsonl"  # flat-file fallback store: "jsonl" or "sqlite"
 
 
 class SkillsConfig(BaseModel):
@@ -24,10 +28,11 @@ class SkillsConfig(BaseModel):
 
 
 class MemoryConfig(BaseModel):
-    storage_dir: Path = Path.home() / ".og" / "memory"
+    storage_dir: Path = Field(default_factory=lambda: Path.home() / ".og" / "memory")
     memory_file: str = "MEMORY.md"
     daily_logs_dir: str = "daily"
     project_id: str = "default"
+    extract_token_delta: int = 8000  # context growth (tokens) between knowledge extractions
 
 
 class DatabaseConfig(BaseModel):
@@ -37,7 +42,12 @@ class DatabaseConfig(BaseModel):
     user: str = "og"
     password: str = "og"
     min_pool: int = 2
-    max_pool: int = 10
+    # Scales with cores so concurrent MCP tool calls, hooks and graph queries don't queue
+    max_pool: int = Field(default_factory=lambda: max(10, 2 * (os.cpu_count() or 1)))
+    command_timeout: float = 30.0  # seconds before a statement is abandoned
+    keyword_index: str = "tsvector"  # keyword ranking: "tsvector" or "bm25" (pg_search)
+    fts_config: str = "english"  # text_search dictionary: "english" or "simple" (match setup-db)
+    semantic_index: str = "full"  # "full", or "bit": Hamming prefilter reranked by embedding
 
     @property
     def dsn(self) -> str:
@@ -48,6 +58,9 @@ class EmbeddingConfig(BaseModel):
     model: str = "mxbai-embed-large"
     dimensions: int = 1024
     ollama_base_url: str = "http://localhost:11434/v1"
+    concurrency: int = 8  # parallel HTTP connections to the embedding server
+    batch_chunk_size: int = 64  # texts per embedding request; larger batches fan out
+    query_timeout: float = 1.0  # seconds search waits for a query embedding before skipping it
 
 
 class ToolsConfig(BaseModel):
@@ -64,11 +77,11 @@ class Config(BaseSettings):
         extra="ignore",
     )
 
-    llm: LLMConfig = LLMConfig()
-    session: SessionConfig = SessionConfig()
-    skills: SkillsConfig = SkillsConfig()
-    memory: MemoryConfig = MemoryConfig()
-    tools: ToolsConfig = ToolsConfig()
-    db: DatabaseConfig = DatabaseConfig()
-    embedding: EmbeddingConfig = EmbeddingConfig()
+    llm: LLMConfig = Field(default_factory=LLMConfig)
+    session: SessionConfig = Field(default_factory=SessionConfig)
+    skills: SkillsConfig = Field(default_factory=SkillsConfig)
+    memory: MemoryConfig = Field(default_factory=MemoryConfig)
+    tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    db: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    embedding: EmbeddingConfig = Field(default_factory=EmbeddingConfig)
     prompts_dir: Path = Path("prompts")
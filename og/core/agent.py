@@ -2,47 +2,174 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
+import io
 import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import AsyncIterator
+from typing import AsyncIterator, Callable
 
-import anthropic
+import orjson
 
 from og.config.schema import Config
 from og.core.budget import BudgetTracker
 from og.core.context import ContextBuilder
+from og.core.llm import get_shared_client
 from og.core.tools import ToolRegistry, ToolResult
 from og.memory.embeddings import EmbeddingClient
 from og.memory.manager import Memory
 from og.memory.pg import PgMemory
+from og.session.sqlite import SqliteSessionStore
 from og.session.store import SessionStore
-from og.skills.loader import SkillRegistry
+from og.skills.loader import Skill, SkillRegistry
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _StreamTurn:
+    """State for one streamed response, shared by the stream event handlers."""
+
+    clock: Callable[[], float]
+    max_batch: int
+    max_wait: float
+    text_buf: io.StringIO = field(default_factory=io.StringIO)
+    tool_uses: list[dict] = field(default_factory=list)
+    current_tool: dict | None = None
+    pending: list[str] = field(default_factory=list)
+    pending_len: int = 0
+    batch_chars: int = 1
+    last_yield: float = 0.0
+
+    def take_pending(self) -> str:
+        text = "".join(self.pending)
+        self.pending.clear()
+        self.pending_len = 0
+        self.last_yield = self.clock()
+        return text
+
+
+# Stream event handlers: each updates the turn state and returns text to yield, if any.
+
+
+def _on_block_start(event, turn: _StreamTurn) -> str | None:
+    if event.content_block.type == "tool_use":
+        turn.current_tool = {
+            "id": event.content_block.id,
+            "name": event.content_block.name,
+            "input_json": [],
+        }
+    return None
+
+
+def _on_text_delta(event, turn: _StreamTurn) -> str | None:
+    text = event.delta.text
+    turn.text_buf.write(text)
+    turn.pending.append(text)
+    turn.pending_len += len(text)
+    if turn.pending_len >= turn.batch_chars or turn.clock() - turn.last_yield >= turn.max_wait:
+        turn.batch_chars = min(turn.batch_chars * 3, turn.max_batch)
+        return turn.take_pending()
+    return None
+
+
+def _on_input_json_delta(event, turn: _StreamTurn) -> str | None:
+    if turn.current_tool:
+        turn.current_tool["input_json"].append(event.delta.partial_json)
+    return None
+
+
+_DELTA_HANDLERS = {
+    "text_delta": _on_text_delta,
+    "input_json_delta": _on_input_json_delta,
+}
+
+
+def _on_block_delta(event, turn: _StreamTurn) -> str | None:
+    handler = _DELTA_HANDLERS.get(event.delta.type)
+    return handler(event, turn) if handler is not None else None
+
+
+def _on_block_stop(event, turn: _StreamTurn) -> str | None:
+    tool = turn.current_tool
+    if tool:
+        # Fragments are joined once; orjson parses the result in one C pass
+        try:
+            parsed_input = orjson.loads("".join(tool["input_json"]))
+        except orjson.JSONDecodeError:
+            parsed_input = {}
+        turn.tool_uses.append(
+            {"type": "tool_use", "id": tool["id"], "name": tool["name"], "input": parsed_input}
+        )
+        turn.current_tool = None
+    return turn.take_pending() if turn.pending else None
+
+
+_STREAM_HANDLERS = {
+    "content_block_start": _on_block_start,
+    "content_block_delta": _on_block_delta,
+    "content_block_stop": _on_block_stop,
+}
+
+
+def _tool_result_block(tool_use_id: str, result: ToolResult) -> dict:
+    """Build a tool_result block, used both as the API payload and the persisted event."""
+    content = result.output if result.success else f"Error: {result.error}\n{result.output}"
+    return {
+        "type": "tool_result",
+        "tool_use_id": tool_use_id,
+        "content": content,
+        "is_error": not result.success,
+    }
+
+
 class Agent:
     """Main agent runtime — orchestrates the LLM ↔ tool loop."""
 
+    # System prompts are reused for repeated (message, matched skills) pairs. The TTL bounds
+    # how stale the memory layer of a cached prompt can get.
+    PROMPT_CACHE_SIZE = 128
+    PROMPT_CACHE_TTL = 300.0  # seconds
+    # Trigger-free messages shorter than this ("yes", "continue") keep the previous prompt
+    SHORT_MESSAGE_CHARS = 16
+
     def __init__(
         self,
         config: Config,
         memory: Memory | PgMemory,
-        session_store: SessionStore | None = None,
+        session_store: SessionStore | SqliteSessionStore | None = None,
         budget: BudgetTracker | None = None,
         pool=None,
     ):
         self.config = config
-        self.client = anthropic.AsyncAnthropic()
+        self.client = get_shared_client()
         self.tools = ToolRegistry(bash_timeout=config.tools.bash_timeout)
+        self._tool_schemas = ToolRegistry.get_tool_schemas()
         self.memory = memory
         self.pool = pool
         self.compact_hook = None
-        self._user_message_count = 0
+        # Context size of the latest LLM call, and its value at the last knowledge extraction
+        self._context_tokens = 0
+        self._extracted_at_tokens = 0
+        self._extract_queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._extract_worker: asyncio.Task | None = None
+        # Materialized message history per session, updated in place as the loop runs
+        self._messages_cache: dict[str, list[dict]] = {}
+        # Post-turn work (memory logging, knowledge extraction) runs in the background
+        self._bg_tasks: set[asyncio.Task] = set()
+        self._prompt_cache: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+        self._last_prompt: dict[str, str] = {}
 
         # Use provided backends or create flat-file defaults
-        self.session_store = session_store or SessionStore(config.session.storage_dir)
+        if session_store is None:
+            if config.session.backend == "sqlite":
+                session_store = SqliteSessionStore(config.session.storage_dir / "sessions.db")
+            else:
+                session_store = SessionStore(config.session.storage_dir)
+        self.session_store = session_store
         self.budget = budget or BudgetTracker(
             budget_limit=config.llm.budget_limit,
             ledger_path=Path.home() / ".og" / "budget.jsonl",
@@ -73,17 +200,26 @@ class Agent:
             from pgvector.asyncpg import register_vector
 
             from og.core.pg_budget import PgBudgetTracker
-            from og.session.pg import PgSessionStore
+            from og.knowledge.graph import AGE_SERVER_SETTINGS, load_age
+            from og.session.pg import PgSessionStore, register_jsonb
+
+            async def init_conn(conn: asyncpg.Connection) -> None:
+                await register_vector(conn)
+                await register_jsonb(conn)
+                await load_age(conn)
 
             pool = await asyncpg.create_pool(
                 dsn=config.db.dsn,
                 min_size=config.db.min_pool,
                 max_size=config.db.max_pool,
-                init=lambda conn: register_vector(conn),
+                init=init_conn,
+                server_settings=AGE_SERVER_SETTINGS,
             )
             embedder = EmbeddingClient(
                 base_url=config.embedding.ollama_base_url,
                 model=config.embedding.model,
+                concurrency=config.embedding.concurrency,
+                batch_chunk_size=config.embedding.batch_chunk_size,
             )
             # Quick connectivity check: embed a test string
             await embedder.embed("connection test")
@@ -94,6 +230,10 @@ class Agent:
                 pool=pool,
                 embedder=embedder,
                 project_id=project_id,
+                keyword_index=config.db.keyword_index,
+                fts_config=config.db.fts_config,
+                semantic_index=config.db.semantic_index,
+                embed_timeout=config.embedding.query_timeout,
             )
             session_store = PgSessionStore(pool=pool, project_id=project_id)
             budget = PgBudgetTracker(
@@ -123,6 +263,10 @@ class Agent:
                     embedder=embedder,
                     project_id=project_id,
                     graph=graph,
+                    keyword_index=config.db.keyword_index,
+                    fts_config=config.db.fts_config,
+                    semantic_index=config.db.semantic_index,
+                    embed_timeout=config.embedding.query_timeout,
                 )
                 agent = cls(
                     config=config,
@@ -160,31 +304,20 @@ class Agent:
         """Execute the full agent loop for a single user message."""
         await self.budget.check()
 
-        # Load existing session
-        events = await self.session_store.load(session_id)
-        if not events:
-            await self.session_store.append(session_id, {"type": "session_start"})
+        # Record user message and reconstruct message history
+        messages = await self._record_user_message(session_id, message)
 
-        # Record user message
-        await self.session_store.append(session_id, {"type": "user_message", "content": message})
-        self._user_message_count += 1
-
-        # Build system prompt with matched skills
-        matched_skills = self.skill_registry.match(message)
-        system_prompt = await self.context_builder.build(message, matched_skills)
-
-        # Reconstruct message history from events
-        all_events = await self.session_store.load(session_id)
-        messages = self.session_store.to_messages(all_events)
+        system_prompt = await self._system_prompt_for(session_id, message)
 
         # Run the LLM ↔ tool loop
-        final_text = await self._loop(system_prompt, messages, session_id)
-
-        # Log to memory
-        await self.memory.log(message, final_text)
+        try:
+            final_text = await self._loop(system_prompt, messages, session_id)
+        except BaseException:
+            self._forget_messages(session_id)
+            raise
 
-        # Maybe extract knowledge
-        await self._maybe_extract_knowledge(session_id, messages)
+        # Log to memory and maybe extract knowledge without holding up the reply
+        self._schedule_post_turn(message, final_text, session_id, messages)
 
         return final_text
 
@@ -192,29 +325,86 @@ class Agent:
         """Execute the agent loop, yielding text deltas as they stream in."""
         await self.budget.check()
 
-        events = await self.session_store.load(session_id)
-        if not events:
-            await self.session_store.append(session_id, {"type": "session_start"})
+        messages = await self._record_user_message(session_id, message)
 
-        await self.session_store.append(session_id, {"type": "user_message", "content": message})
-        self._user_message_count += 1
+        system_prompt = await self._system_prompt_for(session_id, message)
 
-        matched_skills = self.skill_registry.match(message)
-        system_prompt = await self.context_builder.build(message, matched_skills)
+        final_buf = io.StringIO()
+        try:
+            async for chunk in self._loop_stream(system_prompt, messages, session_id):
+                final_buf.write(chunk)
+                yield chunk
+        except BaseException:
+            self._forget_messages(session_id)
+            raise
+        final_text = final_buf.getvalue()
+
+        self._schedule_post_turn(message, final_text, session_id, messages)
+
+    async def _record_user_message(self, session_id: str, message: str) -> list[dict]:
+        """Persist the user message (starting the session if new) and return message history."""
+        messages = self._messages_cache.get(session_id)
+        if messages is None:
+            events = await self.session_store.load(session_id)
+            new_events = []
+            if not events:
+                new_events.append({"type": "session_start"})
+            new_events.append({"type": "user_message", "content": message})
+            await self.session_store.append_many(session_id, new_events)
+
+            # Extend the loaded events in memory rather than reading the session back
+            events.extend(new_events)
+            messages = self.session_store.to_messages(events)
+            self._messages_cache[session_id] = messages
+        else:
+            await self.session_store.append(
+                session_id, {"type": "user_message", "content": message}
+            )
+            messages.append({"role": "user", "content": message})
+
+        return messages
 
-        all_events = await self.session_store.load(session_id)
-        messages = self.session_store.to_messages(all_events)
+    async def _system_prompt_for(self, session_id: str, message: str) -> str:
+        """Return the system prompt for a turn, reusing the session's last one for short replies."""
+        last = self._last_prompt.get(session_id)
+        if (
+            last is not None
+            and len(message) < self.SHORT_MESSAGE_CHARS
+            and not self.skill_registry.contains_trigger(message)
+        ):
+            return last
 
-        final_text = ""
-        async for chunk in self._loop_stream(system_prompt, messages, session_id):
-            final_text += chunk
-            yield chunk
+        matched_skills = self.skill_registry.match(message)
+        system_prompt = await self._build_system_prompt(message, matched_skills)
+        self._last_prompt[session_id] = system_prompt
+        return system_prompt
+
+    async def _build_system_prompt(self, message: str, matched_skills: list[Skill]) -> str:
+        """Build the layered system prompt, reusing a recent one for the same inputs."""
+        key = (
+            hashlib.sha1(message.encode("utf-8")).digest()[:16],
+            tuple(skill.name for skill in matched_skills),
+        )
+        now = time.monotonic()
+        cached = self._prompt_cache.get(key)
+        if cached is not None and now - cached[0] < self.PROMPT_CACHE_TTL:
+            self._prompt_cache.move_to_end(key)
+            return cached[1]
 
-        await self.memory.log(message, final_text)
-        await self._maybe_extract_knowledge(session_id, messages)
+        system_prompt = await self.context_builder.build(message, matched_skills)
+        self._prompt_cache[key] = (now, system_prompt)
+        self._prompt_cache.move_to_end(key)
+        if len(self._prompt_cache) > self.PROMPT_CACHE_SIZE:
+            self._prompt_cache.popitem(last=False)
+        return system_prompt
+
+    def _forget_messages(self, session_id: str) -> None:
+        """Drop cached history so the next turn rebuilds it from the session store."""
+        self._messages_cache.pop(session_id, None)
 
     async def _record_usage(self, usage, session_id: str = "") -> None:
         """Record token usage from an API response."""
+        self._context_tokens = usage.input_tokens + usage.output_tokens
         await self.budget.record(
             model=self.config.llm.model,
             input_tokens=usage.input_tokens,
@@ -222,33 +412,73 @@ class Agent:
             session_id=session_id,
         )
 
-    async def _maybe_extract_knowledge(self, session_id: str, messages: list[dict]) -> None:
-        """Trigger knowledge extraction every 20 user messages."""
-        if self.compact_hook is None:
-            return
-        if self._user_message_count % 20 != 0:
-            return
-
+    async def drain(self) -> None:
+        """Wait for outstanding background post-turn work to finish."""
+        if self._bg_tasks:
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+        if self._extract_worker is not None:
+            await self._extract_queue.join()
+        await self.memory.flush()
+
+    def _schedule_post_turn(
+        self, message: str, final_text: str, session_id: str, messages: list[dict]
+    ) -> None:
+        """Log the exchange in a background task and queue knowledge extraction if due."""
+        task = asyncio.create_task(self._log_memory(message, final_text))
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+        # Snapshot now: the cached history keeps changing once the next turn starts
+        conversation_text = self._extraction_text(messages)
+        if conversation_text:
+            if self._extract_worker is None:
+                self._extract_worker = asyncio.create_task(self._run_extractions())
+            self._extract_queue.put_nowait((session_id, conversation_text))
+
+    async def _log_memory(self, message: str, final_text: str) -> None:
         try:
-            # Build conversation text from recent messages
-            text_parts = []
-            for msg in messages[-40:]:  # Last ~20 exchanges
-                role = msg.get("role", "")
-                content = msg.get("content", "")
-                if isinstance(content, str) and content:
-                    text_parts.append(f"{role}: {content}")
-            conversation_text = "\n".join(text_parts)
-            if conversation_text:
+            await self.memory.log(message, final_text)
+        except Exception:
+            logger.warning("Memory log failed", exc_info=True)
+
+    def _extraction_text(self, messages: list[dict]) -> str:
+        """Return recent conversation text when extraction is due, else an empty string."""
+        if self.compact_hook is None:
+            return ""
+        # A shorter context means a new or different session: restart the count from there
+        self._extracted_at_tokens = min(self._extracted_at_tokens, self._context_tokens)
+        growth = self._context_tokens - self._extracted_at_tokens
+        if growth < self.config.memory.extract_token_delta:
+            return ""
+        self._extracted_at_tokens = self._context_tokens
+
+        # Build conversation text from recent messages
+        buf = io.StringIO()
+        for msg in messages[-40:]:  # Last ~20 exchanges
+            content = msg.get("content", "")
+            if isinstance(content, str) and content:
+                if buf.tell():
+                    buf.write("\n")
+                buf.write(msg.get("role", ""))
+                buf.write(": ")
+                buf.write(content)
+        return buf.getvalue()
+
+    async def _run_extractions(self) -> None:
+        """Worker: run queued knowledge extractions one at a time."""
+        while True:
+            session_id, conversation_text = await self._extract_queue.get()
+            try:
                 count = await self.compact_hook.run(session_id, conversation_text)
                 if count:
                     logger.info("Extracted %d knowledge chunks from session %s", count, session_id)
-        except Exception:
-            logger.warning("Knowledge extraction failed", exc_info=True)
+            except Exception:
+                logger.warning("Knowledge extraction failed", exc_info=True)
+            finally:
+                self._extract_queue.task_done()
 
     async def _loop(self, system: str, messages: list[dict], session_id: str) -> str:
         """Core loop: call LLM, execute tools, repeat until text-only response."""
-        tool_schemas = ToolRegistry.get_tool_schemas()
-
         while True:
             await self.budget.check()
 
@@ -257,7 +487,7 @@ class Agent:
                 max_tokens=self.config.llm.max_tokens,
                 system=system,
                 messages=messages,
-                tools=tool_schemas,
+                tools=self._tool_schemas,
             )
             await self._record_usage(response.usage, session_id)
 
@@ -281,114 +511,73 @@ class Agent:
                         "content": full_text,
                     },
                 )
+                messages.append({"role": "assistant", "content": full_text})
                 return full_text
 
-            # Persist assistant message with tool_use blocks
-            assistant_content = []
-            if full_text:
-                assistant_content.append({"type": "text", "text": full_text})
-            for tu in tool_uses:
-                await self.session_store.append(
-                    session_id,
-                    {
-                        "type": "tool_use",
-                        "tool_use_id": tu.id,
-                        "name": tu.name,
-                        "input": tu.input,
-                    },
-                )
-                assistant_content.append(
-                    {
-                        "type": "tool_use",
-                        "id": tu.id,
-                        "name": tu.name,
-                        "input": tu.input,
-                    }
-                )
+            # tool_use blocks are persisted as-is and shared with the API payload
+            tool_use_blocks = [
+                {"type": "tool_use", "id": tu.id, "name": tu.name, "input": tu.input}
+                for tu in tool_uses
+            ]
+            await self.session_store.append_many(session_id, tool_use_blocks)
 
+            assistant_content = [{"type": "text", "text": full_text}] if full_text else []
+            assistant_content.extend(tool_use_blocks)
             messages.append({"role": "assistant", "content": assistant_content})
 
-            # Execute tools and build results
-            tool_results_content = []
-            for tu in tool_uses:
-                result: ToolResult = await self.tools.execute(tu.name, tu.input)
-                content = (
-                    result.output if result.success else f"Error: {result.error}\n{result.output}"
-                )
-                await self.session_store.append(
-                    session_id,
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": tu.id,
-                        "content": content,
-                        "is_error": not result.success,
-                    },
-                )
-                tool_results_content.append(
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": tu.id,
-                        "content": content,
-                        "is_error": not result.success,
-                    }
-                )
+            # Reads run concurrently; writes, edits and bash run in emitted order
+            results: list[ToolResult] = await self.tools.execute_many(
+                [(tu.name, tu.input) for tu in tool_uses]
+            )
+            tool_results_content = [
+                _tool_result_block(tu.id, result) for tu, result in zip(tool_uses, results)
+            ]
+            await self.session_store.append_many(session_id, tool_results_content)
 
             messages.append({"role": "user", "content": tool_results_content})
 
     async def _loop_stream(
         self, system: str, messages: list[dict], session_id: str
     ) -> AsyncIterator[str]:
-        """Streaming variant of the core loop."""
-        tool_schemas = ToolRegistry.get_tool_schemas()
+        """Streaming variant of the core loop.
+
+        Text deltas are coalesced before being yielded: the first delta goes out at once,
+        then the batch size ramps up by 3x to ``llm.stream_batch_chars``. A partial batch
+        goes out with the first delta arriving ``llm.stream_batch_ms`` after the last yield
+        (there is no timer, so it waits through a pause in the stream) and at each block end.
+        """
+        loop = asyncio.get_running_loop()
 
         while True:
             await self.budget.check()
 
             # Stream the response
-            text_parts = []
-            tool_uses = []
-            current_tool_input = {}
+            turn = _StreamTurn(
+                clock=loop.time,
+                max_batch=self.config.llm.stream_batch_chars,
+                max_wait=self.config.llm.stream_batch_ms / 1000,
+            )
             async with self.client.messages.stream(
                 model=self.config.llm.model,
                 max_tokens=self.config.llm.max_tokens,
                 system=system,
                 messages=messages,
-                tools=tool_schemas,
+                tools=self._tool_schemas,
             ) as stream:
                 async for event in stream:
-                    if event.type == "content_block_start":
-                        if event.content_block.type == "tool_use":
-                            current_tool_input = {
-                                "id": event.content_block.id,
-                                "name": event.content_block.name,
-                                "input_json": "",
-                            }
-                    elif event.type == "content_block_delta":
-                        if event.delta.type == "text_delta":
-                            text_parts.append(event.delta.text)
-                            yield event.delta.text
-                        elif event.delta.type == "input_json_delta":
-                            if current_tool_input:
-                                current_tool_input["input_json"] += event.delta.partial_json
-                    elif event.type == "content_block_stop":
-                        if current_tool_input and current_tool_input.get("input_json") is not None:
-                            try:
-                                parsed_input = json.loads(current_tool_input["input_json"])
-                            except json.JSONDecodeError:
-                                parsed_input = {}
-                            tool_uses.append(
-                                {
-                                    "id": current_tool_input["id"],
-                                    "name": current_tool_input["name"],
-                                    "input": parsed_input,
-                                }
-                            )
-                            current_tool_input = {}
+                    handler = _STREAM_HANDLERS.get(event.type)
+                    if handler is not None:
+                        out = handler(event, turn)
+                        if out:
+                            yield out
+                if turn.pending:
+                    yield turn.take_pending()
                 # Get final message for usage stats
                 final_message = await stream.get_final_message()
                 await self._record_usage(final_message.usage, session_id)
 
-            full_text = "".join(text_parts)
+            full_text = turn.text_buf.getvalue()
+            tool_uses = turn.tool_uses
 
             if not tool_uses:
                 await self.session_store.append(
@@ -398,59 +587,22 @@ class Agent:
                         "content": full_text,
                     },
                 )
+                messages.append({"role": "assistant", "content": full_text})
                 return
 
             # Persist and execute tools (same as non-streaming)
-            assistant_content = []
-            if full_text:
-                assistant_content.append({"type": "text", "text": full_text})
-
-            for tu in tool_uses:
-                await self.session_store.append(
-                    session_id,
-                    {
-                        "type": "tool_use",
-                        "tool_use_id": tu["id"],
-                        "name": tu["name"],
-                        "input": tu["input"],
-                    },
-                )
-                assistant_content.append(
-                    {
-                        "type": "tool_use",
-                        "id": tu["id"],
-                        "name": tu["name"],
-                        "input": tu["input"],
-                    }
-                )
+            # turn.tool_uses already holds API-shaped tool_use blocks
+            await self.session_store.append_many(session_id, tool_uses)
 
+            assistant_content = [{"type": "text", "text": full_text}] if full_text else []
+            assistant_content.extend(tool_uses)
             messages.append({"role": "assistant", "content": assistant_content})
 
+            results = await self.tools.execute_many([(tu["name"], tu["input"]) for tu in tool_uses])
             tool_results_content = []
-            for tu in tool_uses:
-                result = await self.tools.execute(tu["name"], tu["input"])
-                content = (
-                    result.output if result.success else f"Error: {result.error}\n{result.output}"
-                )
-
+            for tu, result in zip(tool_uses, results):
                 yield f"\n\n**[Tool: {tu['name']}]** {'OK' if result.success else 'Error'}\n\n"
-
-                await self.session_store.append(
-                    session_id,
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": tu["id"],
-                        "content": content,
-                        "is_error": not result.success,
-                    },
-                )
-                tool_results_content.append(
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": tu["id"],
-                        "content": content,
-                        "is_error": not result.success,
-                    }
-                )
+                tool_results_content.append(_tool_result_block(tu["id"], result))
+            await self.session_store.append_many(session_id, tool_results_content)
 
             messages.append({"role": "user", "content": tool_results_content})
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
-import json
+import atexit
+import os
+import time
 from pathlib import Path
+from typing import BinaryIO
+
+import orjson
 
 # Pricing per million tokens (USD) as of 2025
 # https://docs.anthropic.com/en/docs/about-claude/models
@@ -16,31 +21,70 @@ PRICING: dict[str, dict[str, float]] = {
 # Fallback for unknown models — use Sonnet pricing as a safe estimate
 DEFAULT_PRICING = {"input": 3.00, "output": 15.00}
 
+# Per-token (input, output) rates, flattened once for the per-call cost computation
+_PER_TOKEN: dict[str, tuple[float, float]] = {
+    model: (p["input"] / 1_000_000, p["output"] / 1_000_000) for model, p in PRICING.items()
+}
+_DEFAULT_PER_TOKEN = (DEFAULT_PRICING["input"] / 1_000_000, DEFAULT_PRICING["output"] / 1_000_000)
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Return the USD cost of one API call."""
+    per_input, per_output = _PER_TOKEN.get(model, _DEFAULT_PER_TOKEN)
+    return input_tokens * per_input + output_tokens * per_output
+
 
 class BudgetExceeded(Exception):
     """Raised when spending would exceed the configured budget."""
 
 
 class BudgetTracker:
-    """Tracks API costs and enforces a spending cap."""
+    """Tracks API costs and enforces a spending cap.
+
+    Ledger lines are group-committed: they are buffered and written with a single
+    write + fsync once FLUSH_RECORDS entries are pending or FLUSH_INTERVAL has passed
+    since the last flush. The ledger file stays open between flushes until close().
+    Enforcement uses the in-memory total, so it never waits on disk.
+    """
+
+    FLUSH_RECORDS = 16
+    FLUSH_INTERVAL = 0.1  # seconds
+    TAIL_BYTES = 4096  # read from the ledger's end to find the last entry
 
     def __init__(self, budget_limit: float, ledger_path: Path):
         self.budget_limit = budget_limit
         self.ledger_path = ledger_path
         self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
         self._total_cost = self._load_total()
+        self._pending: list[bytes] = []
+        self._last_flush = time.monotonic()
+        self._fh: BinaryIO | None = None
+        atexit.register(self.close)
 
     def _load_total(self) -> float:
         if not self.ledger_path.exists():
             return 0.0
-        total = 0.0
-        with open(self.ledger_path, encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    entry = json.loads(line)
-                    total += entry.get("cost", 0.0)
-        return total
+        # Every entry carries the running total, so the last complete line is enough
+        with open(self.ledger_path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - self.TAIL_BYTES))
+            tail = f.read()
+        for line in reversed(tail.splitlines()):
+            if line.strip():
+                try:
+                    return float(orjson.loads(line)["total"])
+                except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+                    break
+        return self._sum_ledger()
+
+    def _sum_ledger(self) -> float:
+        """Recompute the total from every entry's cost (torn or legacy last line)."""
+        # One bulk read; orjson parses each line straight from bytes
+        return sum(
+            orjson.loads(line).get("cost", 0.0)
+            for line in self.ledger_path.read_bytes().splitlines()
+            if line.strip()
+        )
 
     async def check(self) -> None:
         """Raise BudgetExceeded if we've hit the limit."""
@@ -53,8 +97,7 @@ class BudgetTracker:
         self, model: str, input_tokens: int, output_tokens: int, session_id: str = ""
     ) -> float:
         """Record token usage and return the cost of this call."""
-        pricing = PRICING.get(model, DEFAULT_PRICING)
-        cost = (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
+        cost = call_cost(model, input_tokens, output_tokens)
         self._total_cost += cost
 
         entry = {
@@ -64,11 +107,37 @@ class BudgetTracker:
             "cost": cost,
             "total": self._total_cost,
         }
-        with open(self.ledger_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
+        self._pending.append(orjson.dumps(entry) + b"\n")
+        if (
+            len(self._pending) >= self.FLUSH_RECORDS
+            or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL
+        ):
+            self._write_pending()
 
         return cost
 
+    async def flush(self) -> None:
+        """Write any buffered ledger entries to disk."""
+        self._write_pending()
+
+    def _write_pending(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        if self._fh is None:
+            self._fh = open(self.ledger_path, "ab")
+        self._fh.write(b"".join(self._pending))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Flush buffered entries and release the ledger file handle."""
+        self._write_pending()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
     @property
     def total_cost(self) -> float:
         return self._total_cost
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from pathlib import Path
 
@@ -24,12 +25,57 @@ class ContextBuilder:
         self.prompts_dir = Path(prompts_dir)
         self.memory = memory
         self.skill_registry = skill_registry
+        # filename -> (mtime, text); files are re-read only when their mtime changes
+        self._prompts: dict[str, tuple[float, str]] = {}
+        self._catalog = self._build_catalog(skill_registry.skills)
+        # Joined static layers (1-4), rebuilt only when a prompt file changes
+        self._static_key: tuple[str, ...] | None = None
+        self._static_prefix = ""
 
     def _read_prompt(self, filename: str) -> str:
         path = self.prompts_dir / filename
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-        return ""
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            self._prompts.pop(filename, None)
+            return ""
+        cached = self._prompts.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        text = path.read_text(encoding="utf-8")
+        self._prompts[filename] = (mtime, text)
+        return text
+
+    @staticmethod
+    def _build_catalog(all_skills: list[Skill]) -> str:
+        """Render the always-present skill catalog; skills are fixed once discovered."""
+        if not all_skills:
+            return ""
+        return "# Available Skills\n\n" + "".join(skill.catalog_line for skill in all_skills)
+
+    def _get_static_prefix(self) -> str:
+        """Return layers 1-4 joined, re-joining only when a prompt file has changed."""
+        key = (
+            self._read_prompt("AGENTS.md"),
+            self._read_prompt("SOUL.md"),
+            self._read_prompt("TOOLS.md"),
+            self._catalog,
+        )
+        if key != self._static_key:
+            self._static_key = key
+            self._static_prefix = "\n\n---\n\n".join(layer for layer in key if layer)
+        return self._static_prefix
+
+    async def _contradictions_for(self, entities: list[str] | None) -> list[dict]:
+        """Return contradictions for the entities, or [] without a graph or on failure."""
+        if not entities or not isinstance(self.memory, PgMemory) or self.memory.graph is None:
+            return []
+        try:
+            # KnowledgeGraph memoizes these and drops them when the graph is written
+            return await self.memory.graph.find_contradictions(entities)
+        except Exception:
+            logger.debug("Contradiction check failed", exc_info=True)
+            return []
 
     async def build(
         self,
@@ -39,59 +85,39 @@ class ContextBuilder:
     ) -> str:
         sections = []
 
-        # Layer 1: Agent identity
-        agents_md = self._read_prompt("AGENTS.md")
-        if agents_md:
-            sections.append(agents_md)
-
-        # Layer 2: Behavioral guidelines
-        soul_md = self._read_prompt("SOUL.md")
-        if soul_md:
-            sections.append(soul_md)
-
-        # Layer 3: Tool descriptions
-        tools_md = self._read_prompt("TOOLS.md")
-        if tools_md:
-            sections.append(tools_md)
-
-        # Layer 4: Skill catalog (always present)
-        all_skills = self.skill_registry.skills
-        if all_skills:
-            catalog = "# Available Skills\n\n"
-            for skill in all_skills:
-                triggers = ", ".join(f'"{t}"' for t in skill.triggers)
-                catalog += f"- **{skill.name}**: {skill.description} (triggers: {triggers})\n"
-            sections.append(catalog)
+        # Layers 1-4: AGENTS.md (identity), SOUL.md (behavior), TOOLS.md, skill catalog
+        static_prefix = self._get_static_prefix()
+        if static_prefix:
+            sections.append(static_prefix)
 
         # Layer 5: Matched skill instructions (only when triggered)
         if matched_skills:
-            skills_section = (
+            sections.append(
                 "# Active Skills\n\nThe following skills are relevant to this request:\n"
+                + "".join(f"\n---\n\n{skill.instructions}\n" for skill in matched_skills)
             )
-            for skill in matched_skills:
-                skills_section += f"\n---\n\n{skill.instructions}\n"
-            sections.append(skills_section)
+
+        # Layers 6 and 7 are independent lookups, so fetch them concurrently
+        memory_content, contradictions = await asyncio.gather(
+            self.memory.load_memory(message),
+            self._contradictions_for(entities),
+        )
 
         # Layer 6: Memory context
-        memory_content = await self.memory.load_memory(message)
         if memory_content:
             sections.append(
                 f"# Memory\n\nPersisted facts from previous sessions:\n\n{memory_content}"
             )
 
         # Layer 7: Contradiction warnings (when graph is available)
-        if entities and isinstance(self.memory, PgMemory) and self.memory.graph is not None:
-            try:
-                contradictions = await self.memory.graph.find_contradictions(entities)
-                if contradictions:
-                    warnings = "# Contradiction Warnings\n\n"
-                    warnings += (
-                        "The following stored knowledge items may contradict each other:\n\n"
-                    )
-                    for c in contradictions:
-                        warnings += f"- **A:** {c['statement_a']}\n  **B:** {c['statement_b']}\n\n"
-                    sections.append(warnings)
-            except Exception:
-                logger.debug("Contradiction check failed", exc_info=True)
+        if contradictions:
+            sections.append(
+                "# Contradiction Warnings\n\n"
+                "The following stored knowledge items may contradict each other:\n\n"
+                + "".join(
+                    f"- **A:** {c['statement_a']}\n  **B:** {c['statement_b']}\n\n"
+                    for c in contradictions
+                )
+            )
 
         return "\n\n---\n\n".join(sections)
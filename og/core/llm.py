@@ -0,0 +1,30 @@
+"""Process-wide Anthropic client shared by the agent and knowledge extractor."""
+
+from __future__ import annotations
+
+import importlib.util
+
+import anthropic
+import httpx
+
+# HTTP/2 multiplexes concurrent streams over one connection; httpx needs the optional h2 package
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_SHARED_CLIENT: anthropic.AsyncAnthropic | None = None
+
+
+def get_shared_client() -> anthropic.AsyncAnthropic:
+    """Return the shared AsyncAnthropic client, creating it on first use.
+
+    Sharing one client keeps its HTTP connection pool (keep-alive, TLS sessions) warm
+    across Agent instances and extraction calls instead of handshaking per client.
+    """
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None:
+        _SHARED_CLIENT = anthropic.AsyncAnthropic(
+            http_client=anthropic.DefaultAsyncHttpxClient(
+                http2=_HTTP2,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            ),
+        )
+    return _SHARED_CLIENT
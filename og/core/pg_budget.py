@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING
 
-from og.core.budget import PRICING, DEFAULT_PRICING, BudgetExceeded
+from og.core.budget import BudgetExceeded, call_cost
 
 if TYPE_CHECKING:
     import asyncpg
 
 logger = logging.getLogger(__name__)
 
+# budget_totals is kept current by a trigger on budget_ledger (see scripts/setup-db.py)
+TOTAL_SQL = "SELECT total_usd::float FROM budget_totals WHERE project_id = $1"
+
+# Fallback for databases set up before budget_totals existed
 SUM_SQL = "SELECT COALESCE(SUM(cost_usd), 0)::float FROM budget_ledger WHERE project_id = $1"
 
 INSERT_SQL = """
@@ -21,20 +26,35 @@ VALUES ($1, $2, $3, $4, $5, $6)
 
 
 class PgBudgetTracker:
-    """PostgreSQL-backed budget tracker with lazy total loading."""
+    """PostgreSQL-backed budget tracker with lazy total loading.
+
+    Ledger rows are queued and written by a background task, one executemany per batch of
+    up to FLUSH_ROWS rows or FLUSH_INTERVAL of waiting, so record() never waits on the DB.
+    """
+
+    FLUSH_ROWS = 100
+    FLUSH_INTERVAL = 0.05  # seconds
 
     def __init__(self, pool: asyncpg.Pool, project_id: str, budget_limit: float):
         self.pool = pool
         self.project_id = project_id
         self.budget_limit = budget_limit
         self._total_cost: float | None = None  # Lazy-loaded
+        self._queue: asyncio.Queue[tuple] = asyncio.Queue()
+        self._writer: asyncio.Task | None = None
 
     async def _ensure_total(self) -> None:
         """Lazy-load the running total from the database on first access."""
         if self._total_cost is not None:
             return
         try:
-            row = await self.pool.fetchrow(SUM_SQL, self.project_id)
+            # One checkout covers both the totals lookup and its fallback
+            async with self.pool.acquire() as conn:
+                try:
+                    row = await conn.fetchrow(TOTAL_SQL, self.project_id)
+                except Exception:
+                    logger.debug("budget_totals unavailable, summing ledger", exc_info=True)
+                    row = await conn.fetchrow(SUM_SQL, self.project_id)
             self._total_cost = row[0] if row else 0.0
         except Exception:
             logger.warning("PgBudgetTracker: failed to load total, assuming 0", exc_info=True)
@@ -51,28 +71,46 @@ class PgBudgetTracker:
     async def record(
         self, model: str, input_tokens: int, output_tokens: int, session_id: str = ""
     ) -> float:
-        """Record token usage to PostgreSQL and return the cost."""
-        pricing = PRICING.get(model, DEFAULT_PRICING)
-        cost = (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
+        """Record token usage (queued for a batched INSERT) and return the cost."""
+        cost = call_cost(model, input_tokens, output_tokens)
 
         await self._ensure_total()
         self._total_cost += cost
 
-        try:
-            await self.pool.execute(
-                INSERT_SQL,
-                self.project_id,
-                session_id,
-                model,
-                input_tokens,
-                output_tokens,
-                cost,
-            )
-        except Exception:
-            logger.warning("PgBudgetTracker.record failed", exc_info=True)
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_batches())
+        self._queue.put_nowait(
+            (self.project_id, session_id, model, input_tokens, output_tokens, cost)
+        )
 
         return cost
 
+    async def flush(self) -> None:
+        """Wait until every queued ledger row has been written."""
+        if self._writer is not None:
+            await self._queue.join()
+
+    async def _write_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.FLUSH_INTERVAL
+            while len(batch) < self.FLUSH_ROWS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            try:
+                await self.pool.executemany(INSERT_SQL, batch)
+            except Exception:
+                logger.warning("PgBudgetTracker: ledger write failed", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
     @property
     def total_cost(self) -> float:
         return self._total_cost if self._total_cost is not None else 0.0
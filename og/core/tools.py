@@ -3,10 +3,17 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import shlex
+import stat
 import subprocess
+import weakref
 from dataclasses import dataclass
 from pathlib import Path
 
+# Commands containing none of these can be exec'd directly without a /bin/sh hop
+_SHELL_META = frozenset("|&;<>()$`\\\"'*?[]{}~=#!\n")
+
 
 @dataclass
 class ToolResult:
@@ -18,14 +25,51 @@ class ToolResult:
         return self.error is None
 
 
+async def _read_capped(stream: asyncio.StreamReader, cap: int) -> bytes:
+    """Read a stream to EOF, keeping only its last ``cap`` bytes."""
+    buf = bytearray()
+    truncated = False
+    while chunk := await stream.read(65536):
+        buf += chunk
+        if len(buf) > cap:
+            del buf[: len(buf) - cap]
+            truncated = True
+    if truncated:
+        return b"[... earlier output truncated ...]\n" + buf
+    return bytes(buf)
+
+
 class ToolRegistry:
     """Registry of the 4 Pi agent tools."""
 
+    # Per-stream bash output kept in memory; the tail is usually the informative part
+    BASH_OUTPUT_CAP = 256 * 1024
+    # Tools with no side effects; execute_many runs consecutive calls of these concurrently
+    READ_ONLY = frozenset({"read"})
+
     def __init__(self, bash_timeout: int = 30):
         self.bash_timeout = bash_timeout
+        self._handlers = {
+            "read": self._tool_read,
+            "write": self._tool_write,
+            "edit": self._tool_edit,
+            "bash": self._tool_bash,
+        }
+        # Resolved path -> lock held across a write or edit; entries go once no call holds one
+        self._path_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _path_lock(self, path: str) -> asyncio.Lock:
+        """Return the lock serializing writes and edits to ``path``'s resolved location."""
+        key = os.path.realpath(os.path.expanduser(path))
+        lock = self._path_locks.get(key)
+        if lock is None:
+            lock = self._path_locks[key] = asyncio.Lock()
+        return lock
 
     async def execute(self, name: str, args: dict) -> ToolResult:
-        handler = getattr(self, f"_tool_{name}", None)
+        handler = self._handlers.get(name)
         if handler is None:
             return ToolResult(output="", error=f"Unknown tool: {name}")
         try:
@@ -33,65 +77,130 @@ class ToolRegistry:
         except Exception as e:
             return ToolResult(output="", error=str(e))
 
+    async def execute_many(self, calls: list[tuple[str, dict]]) -> list[ToolResult]:
+        """Run one turn's (name, args) tool calls, returning results in call order.
+
+        Runs of consecutive read-only calls execute concurrently; write, edit and bash calls
+        run one at a time in the order they were emitted, so a later call sees earlier effects.
+        """
+        results: list[ToolResult] = []
+        reads: list[tuple[str, dict]] = []
+        for name, args in calls:
+            if name in self.READ_ONLY:
+                reads.append((name, args))
+                continue
+            if reads:
+                results.extend(await asyncio.gather(*(self.execute(*c) for c in reads)))
+                reads = []
+            results.append(await self.execute(name, args))
+        if reads:
+            results.extend(await asyncio.gather(*(self.execute(*c) for c in reads)))
+        return results
+
     async def _tool_read(self, path: str) -> ToolResult:
+        return await asyncio.to_thread(self._read_file, path)
+
+    async def _tool_write(self, path: str, content: str) -> ToolResult:
+        async with self._path_lock(path):
+            return await asyncio.to_thread(self._write_file, path, content)
+
+    async def _tool_edit(self, path: str, old_text: str, new_text: str) -> ToolResult:
+        # Read, check and write in one worker-thread hop, under the path's lock so a
+        # concurrent edit can't read the content before this one writes it back
+        async with self._path_lock(path):
+            return await asyncio.to_thread(self._edit_file, path, old_text, new_text)
+
+    # File IO runs in worker threads so large files don't stall the event loop
+
+    @staticmethod
+    def _read_file(path: str) -> ToolResult:
         p = Path(path).expanduser().resolve()
-        if not p.exists():
-            return ToolResult(output="", error=f"File not found: {path}")
-        if not p.is_file():
-            return ToolResult(output="", error=f"Not a file: {path}")
+        # One stat for both checks: FIFOs and devices would block the read or never reach EOF
         try:
-            content = p.read_text(encoding="utf-8")
-            return ToolResult(output=content)
+            if not stat.S_ISREG(p.stat().st_mode):
+                return ToolResult(output="", error=f"Not a file: {path}")
+            return ToolResult(output=p.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return ToolResult(output="", error=f"File not found: {path}")
         except UnicodeDecodeError:
             return ToolResult(output="", error=f"Cannot read binary file: {path}")
 
-    async def _tool_write(self, path: str, content: str) -> ToolResult:
+    @staticmethod
+    def _write_file(path: str, content: str) -> ToolResult:
         p = Path(path).expanduser().resolve()
         p.parent.mkdir(parents=True, exist_ok=True)
         p.write_text(content, encoding="utf-8")
         return ToolResult(output=f"Wrote {len(content)} bytes to {path}")
 
-    async def _tool_edit(self, path: str, old_text: str, new_text: str) -> ToolResult:
+    @staticmethod
+    def _edit_file(path: str, old_text: str, new_text: str) -> ToolResult:
         p = Path(path).expanduser().resolve()
         if not p.exists():
             return ToolResult(output="", error=f"File not found: {path}")
         content = p.read_text(encoding="utf-8")
-        count = content.count(old_text)
-        if count == 0:
+        # find() twice rather than count(): stops at the second match, and the splice
+        # below reuses the first offset instead of a replace() rescan
+        first = content.find(old_text)
+        if first < 0:
             return ToolResult(output="", error="old_text not found in file")
-        if count > 1:
+        end = first + len(old_text)
+        if content.find(old_text, end) >= 0:
             return ToolResult(
                 output="",
-                error=f"old_text matches {count} locations — must be unique",
+                error=f"old_text matches {content.count(old_text)} locations — must be unique",
             )
-        new_content = content.replace(old_text, new_text, 1)
-        p.write_text(new_content, encoding="utf-8")
+        p.write_text(content[:first] + new_text + content[end:], encoding="utf-8")
         return ToolResult(output=f"Edited {path}")
 
     async def _tool_bash(self, command: str, timeout: int | None = None) -> ToolResult:
         timeout = timeout or self.bash_timeout
         try:
-            proc = await asyncio.create_subprocess_shell(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
-            output = stdout.decode("utf-8", errors="replace")
-            err_output = stderr.decode("utf-8", errors="replace")
+            proc = await self._spawn(command)
+            stdout, stderr = await asyncio.wait_for(self._communicate(proc), timeout=timeout)
+            # Both exit paths report stdout followed by stderr: join the bytes, decode once
+            buf = bytearray(stdout)
+            buf += stderr
+            output = buf.decode("utf-8", errors="replace")
             if proc.returncode != 0:
-                combined = output + err_output if output else err_output
                 return ToolResult(
-                    output=combined,
+                    output=output,
                     error=f"Exit code {proc.returncode}",
                 )
-            if err_output:
-                output += err_output
             return ToolResult(output=output)
         except asyncio.TimeoutError:
             proc.kill()
             return ToolResult(output="", error=f"Command timed out after {timeout}s")
 
+    async def _communicate(self, proc: asyncio.subprocess.Process) -> tuple[bytes, bytes]:
+        """Like proc.communicate(), but with bounded memory for runaway output."""
+        stdout, stderr = await asyncio.gather(
+            _read_capped(proc.stdout, self.BASH_OUTPUT_CAP),
+            _read_capped(proc.stderr, self.BASH_OUTPUT_CAP),
+        )
+        await proc.wait()
+        return stdout, stderr
+
+    @staticmethod
+    async def _spawn(command: str) -> asyncio.subprocess.Process:
+        """Start a command, skipping the shell when it has no shell syntax."""
+        if not _SHELL_META.intersection(command):
+            args = shlex.split(command)
+            if args:
+                try:
+                    return await asyncio.create_subprocess_exec(
+                        *args,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                    )
+                except (FileNotFoundError, PermissionError):
+                    # Builtins (cd, export, ...) and unknown names: let the shell handle them
+                    pass
+        return await asyncio.create_subprocess_shell(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
     @staticmethod
     def get_tool_schemas() -> list[dict]:
         return [
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from dataclasses import dataclass, field
 
-import anthropic
+import orjson
+
+from og.core.llm import get_shared_client
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,13 @@ Return ONLY a JSON array of these objects. If no knowledge worth extracting, ret
 Conversation:
 {conversation}"""
 
+# The template is constant, so split it once and concatenate per call instead of .format()
+PROMPT_HEAD, PROMPT_TAIL = EXTRACTION_PROMPT.split("{conversation}")
+
+# Characters of conversation sent for extraction. Slicing str by code point never splits a
+# UTF-8 sequence, and 8000 code points are at most 32 KB encoded, so no byte cap is needed.
+MAX_CONVERSATION_CHARS = 8000
+
 
 @dataclass
 class KnowledgeChunk:
@@ -50,13 +58,14 @@ class KnowledgeExtractor:
 
     def __init__(self, model: str = "claude-haiku-4-5-20251001"):
         self.model = model
-        self.client = anthropic.AsyncAnthropic()
+        self.client = get_shared_client()
 
     async def extract(self, conversation_text: str) -> list[KnowledgeChunk]:
         """Extract knowledge chunks from a conversation transcript."""
         if not conversation_text.strip():
             return []
 
+        conversation = conversation_text[:MAX_CONVERSATION_CHARS]
         try:
             response = await self.client.messages.create(
                 model=self.model,
@@ -64,21 +73,22 @@ class KnowledgeExtractor:
                 messages=[
                     {
                         "role": "user",
-                        "content": EXTRACTION_PROMPT.format(conversation=conversation_text[:8000]),
+                        "content": PROMPT_HEAD + conversation + PROMPT_TAIL,
                     }
                 ],
             )
 
             raw_text = response.content[0].text.strip()
 
-            # Handle markdown code blocks in response
-            if raw_text.startswith("```"):
-                lines = raw_text.split("\n")
-                # Remove first and last lines (```json and ```)
-                lines = [ln for ln in lines if not ln.strip().startswith("```")]
-                raw_text = "\n".join(lines)
+            # Handle markdown code blocks in response: drop the ```json line, then
+            # everything from the closing fence on (one scan from each end)
+            if raw_text[:3] == "```":
+                raw_text = raw_text.partition("\n")[2]
+                body, fence, _ = raw_text.rpartition("```")
+                if fence:
+                    raw_text = body
 
-            data = json.loads(raw_text)
+            data = orjson.loads(raw_text)
             if not isinstance(data, list):
                 return []
 
@@ -102,14 +112,14 @@ class KnowledgeExtractor:
                     KnowledgeChunk(
                         chunk_type=chunk_type,
                         text=text,
-                        entities=item.get("entities", []) or [],
-                        related_to=item.get("related_to", []) or [],
+                        entities=item.get("entities") or [],
+                        related_to=item.get("related_to") or [],
                         relation_type=relation_type,
                     )
                 )
             return chunks
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.warning("Knowledge extraction returned invalid JSON", exc_info=True)
             return []
         except Exception:
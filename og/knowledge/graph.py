@@ -2,94 +2,292 @@
 
 from __future__ import annotations
 
+import functools
 import logging
-import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
+import orjson
+
 if TYPE_CHECKING:
     import asyncpg
 
 logger = logging.getLogger(__name__)
 
 GRAPH_NAME = "og_knowledge"
-AGE_SEARCH_PATH = "SET search_path = ag_catalog, public;"
 
+# Pass to asyncpg.create_pool(server_settings=...). A startup parameter survives the
+# RESET ALL asyncpg issues when a connection goes back to the pool; a SET would not.
+AGE_SERVER_SETTINGS = {"search_path": "ag_catalog, public"}
 
-def _escape(s: str) -> str:
-    """Escape a string for use in a Cypher literal."""
-    return s.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
+VERTEX_LABELS = ("Decision", "Correction", "Constraint", "Pattern", "Fact")
+# chunk_type -> vertex label; types without a label of their own are stored as Pattern
+_LABEL_BY_TYPE = {label.lower(): label for label in VERTEX_LABELS}
 
+# Session vertex ids by (project_id, session_id). Graph objects are often built per request
+# (MCP store, hook commands), so the cache lives at module level to outlast them.
+SESSION_VID_CACHE_SIZE = 1024
+_SESSION_VIDS: OrderedDict[tuple[str, str], int] = OrderedDict()
+
+_AGTYPE_ANNOTATIONS = frozenset({"vertex", "edge", "numeric"})
+
+EDGE_TYPES = (
+    "CONTRADICTS",
+    "SUPERSEDES",
+    "DEPENDS_ON",
+    "REJECTED_IN_FAVOR_OF",
+    "DISCOVERED_IN",
+    "CAUSED_BY",
+)
+
+
+async def load_age(conn: asyncpg.Connection) -> None:
+    """Pool ``init`` hook: load AGE once per connection instead of before every query."""
+    try:
+        await conn.execute("LOAD 'age';")
+    except Exception:
+        pass  # Already loaded via shared_preload_libraries
+    try:
+        # Parameters are sent as JSON map text; results decode straight to Python values
+        await conn.set_type_codec(
+            "agtype", schema="ag_catalog", encoder=str, decoder=_decode_agtype, format="text"
+        )
+    except Exception:
+        logger.debug("agtype codec not registered (AGE unavailable?)", exc_info=True)
+
+
+def _label_for(chunk_type: str) -> str:
+    """Map a chunk type to its vertex label (case-insensitive), defaulting to Pattern."""
+    return _LABEL_BY_TYPE.get(chunk_type) or _LABEL_BY_TYPE.get(chunk_type.lower(), "Pattern")
 
-def _parse_agtype_id(val: Any) -> int | None:
-    """Parse an agtype value to extract a vertex/edge id."""
-    if val is None:
-        return None
-    s = str(val)
-    # agtype ids look like "12345::bigint" or just an integer
-    match = re.search(r"(\d+)", s)
-    return int(match.group(1)) if match else None
 
+def _decode_agtype(text: str) -> Any:
+    """Decode agtype text output into int/float/str/bool/None/dict/list.
 
-def _parse_agtype_float(val: Any) -> float:
-    """Parse an agtype value to a float."""
-    if val is None:
-        return 0.0
-    s = str(val).rstrip("::float8").rstrip("::numeric")
+    Scalars and maps are JSON apart from a trailing type annotation (``::vertex``,
+    ``::edge``, ``::numeric``) and the float spellings NaN/Infinity.
+    """
+    head, sep, annotation = text.rpartition("::")
+    if sep and annotation in _AGTYPE_ANNOTATIONS:
+        if annotation == "numeric":
+            return float(head)
+        text = head
     try:
-        return float(re.search(r"[\d.]+", s).group(0))
-    except (AttributeError, ValueError):
-        return 0.0
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        try:
+            return float(text)
+        except ValueError:
+            return text  # Paths nest annotated vertices; leave them as text
 
 
 def _cypher_query(cypher: str, result_columns: str) -> str:
-    """Build the SQL wrapper for a Cypher query."""
-    return f"SELECT * FROM cypher('{GRAPH_NAME}', $$ {cypher} $$) AS ({result_columns});"
+    """Build the SQL wrapper for a Cypher query whose $params come from an agtype map in $1.
+
+    The SQL text is fixed per query shape, so asyncpg's statement cache prepares it once per
+    connection and values never need escaping into the Cypher source.
+    """
+    return f"SELECT * FROM cypher('{GRAPH_NAME}', $$ {cypher} $$, $1) AS ({result_columns});"
+
+
+def _params(**values: Any) -> str:
+    """Encode Cypher parameters as the agtype map passed in $1."""
+    return orjson.dumps(values).decode()
+
+
+MERGE_SESSION_SQL = _cypher_query(
+    "MERGE (s:Session {session_id: $session_id, project_id: $project_id}) RETURN id(s)",
+    "vid agtype",
+)
+
+# Labels and relationship types cannot be parameters, so there is one statement per label
+CREATE_VERTEX_SQL = {
+    label: _cypher_query(
+        f"CREATE (n:{label} {{chunk_id: $chunk_id, text: $text, "
+        f"entities: $entities, project_id: $project_id}}) RETURN id(n)",
+        "vid agtype",
+    )
+    for label in VERTEX_LABELS
+}
+
+CREATE_EDGE_SQL = {
+    edge_type: _cypher_query(
+        f"MATCH (a), (b) WHERE id(a) = $from_id AND id(b) = $to_id CREATE (a)-[:{edge_type}]->(b)",
+        "dummy agtype",
+    )
+    for edge_type in EDGE_TYPES
+}
+
+# Batched forms of the above for PreCompactHook: one call per label / edge type per run
+CREATE_VERTICES_SQL = {
+    label: _cypher_query(
+        f"UNWIND $rows AS r CREATE (n:{label} {{chunk_id: r.chunk_id, text: r.text, "
+        f"entities: r.entities, project_id: $project_id}}) RETURN r.idx, id(n)",
+        "idx agtype, vid agtype",
+    )
+    for label in VERTEX_LABELS
+}
+
+CREATE_EDGES_SQL = {
+    edge_type: _cypher_query(
+        "UNWIND $edges AS e MATCH (a), (b) WHERE id(a) = e.from_id AND id(b) = e.to_id "
+        f"CREATE (a)-[:{edge_type}]->(b)",
+        "dummy agtype",
+    )
+    for edge_type in EDGE_TYPES
+}
+
+# Seed vertices are de-duplicated before traversal so a vertex matching several entities
+# is counted once, as with the OR-ed conditions these replace. The project is matched as a
+# property map so AGE can use the GIN index on each label's properties (see setup-db.py).
+FIND_CONTRADICTIONS_SQL = _cypher_query(
+    "UNWIND $entities AS e "
+    "MATCH (n {project_id: $project_id}) WHERE e IN n.entities "
+    "WITH DISTINCT n "
+    "MATCH (n)-[:CONTRADICTS]-(m) "
+    "RETURN n.text, m.text, n.chunk_id, m.chunk_id LIMIT 10",
+    "text1 agtype, text2 agtype, id1 agtype, id2 agtype",
+)
+
+RETRIEVE_RELATED_CYPHER = (
+    "UNWIND $entities AS e "
+    "MATCH (n {{project_id: $project_id}}) WHERE e IN n.entities "
+    "WITH DISTINCT n "
+    "MATCH (n)-[*1..2]-(m) "
+    "WHERE m.chunk_id IS NOT NULL "
+    "WITH DISTINCT m.chunk_id AS chunk_id, "
+    "count(*) AS path_count "
+    "RETURN chunk_id, path_count "
+    "ORDER BY path_count DESC LIMIT {limit}"
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _retrieve_related_sql(limit: int) -> str:
+    """Build the retrieve_related statement once per LIMIT (LIMIT cannot be a parameter)."""
+    return _cypher_query(
+        RETRIEVE_RELATED_CYPHER.format(limit=limit), "chunk_id agtype, path_count agtype"
+    )
 
 
 class KnowledgeGraph:
     """Apache AGE graph operations for knowledge storage and retrieval."""
 
+    # Read traversals are memoized briefly; any write through this instance invalidates them
+    QUERY_CACHE_SIZE = 512
+    QUERY_CACHE_TTL = 30.0  # seconds
+
     def __init__(self, pool: asyncpg.Pool, project_id: str):
         self.pool = pool
         self.project_id = project_id
-
-    async def _execute_cypher(self, cypher: str, result_columns: str) -> list[asyncpg.Record]:
-        """Execute a Cypher query and return results."""
-        sql = _cypher_query(cypher, result_columns)
+        self._query_cache: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+        # Bumped on every write; part of each cache key, so stale entries are never hit
+        self._version = 0
+
+    async def _memoized(self, key: tuple, fetch: Callable[[], Awaitable[list]]) -> list:
+        """Return a cached read result for ``key`` or run ``fetch`` and cache it."""
+        key = (self._version, *key)
+        now = time.monotonic()
+        hit = self._query_cache.get(key)
+        if hit is not None and hit[0] > now:
+            self._query_cache.move_to_end(key)
+            return hit[1]
+        result = await fetch()
+        self._query_cache[key] = (now + self.QUERY_CACHE_TTL, result)
+        self._query_cache.move_to_end(key)
+        if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return result
+
+    async def _execute_cypher(self, sql: str, params: str) -> list[asyncpg.Record]:
+        """Execute a parameterized Cypher query and return results."""
         try:
-            async with self.pool.acquire() as conn:
-                try:
-                    await conn.execute("LOAD 'age';")
-                except Exception:
-                    pass  # Already loaded via shared_preload_libraries
-                await conn.execute(AGE_SEARCH_PATH)
-                return await conn.fetch(sql)
+            # AGE is loaded and on the search_path via the pool's init/server_settings
+            return await self.pool.fetch(sql, params)
         except Exception:
-            logger.warning("Cypher query failed: %s", cypher[:100], exc_info=True)
+            logger.warning("Cypher query failed: %s", sql[:100], exc_info=True)
             return []
 
     async def _execute_cypher_in_tx(
-        self, conn: asyncpg.Connection, cypher: str, result_columns: str
+        self, conn: asyncpg.Connection, sql: str, params: str
     ) -> list[asyncpg.Record]:
-        """Execute a Cypher query within an existing connection/transaction."""
-        sql = _cypher_query(cypher, result_columns)
+        """Execute a parameterized Cypher query within an existing connection/transaction.
+
+        Errors propagate: a failed statement aborts the transaction, so the caller must see
+        it and roll back rather than carry on and have COMMIT silently roll back instead.
+        """
+        return await conn.fetch(sql, params)
+
+    # Edge writes have no RETURN, so they go through execute(): no result rows to build
+
+    async def _write_cypher(self, sql: str, params: str) -> None:
+        """Execute a parameterized Cypher write, discarding any output."""
         try:
-            return await conn.fetch(sql)
+            await self.pool.execute(sql, params)
         except Exception:
-            logger.warning("Cypher query failed in tx: %s", cypher[:100], exc_info=True)
-            return []
+            logger.warning("Cypher write failed: %s", sql[:100], exc_info=True)
+
+    async def _write_cypher_in_tx(self, conn: asyncpg.Connection, sql: str, params: str) -> None:
+        """Execute a parameterized Cypher write within an existing connection/transaction.
+
+        Errors propagate, as in _execute_cypher_in_tx.
+        """
+        await conn.execute(sql, params)
+
+    def _vertex_args(
+        self, chunk_id: int, chunk_type: str, text: str, entities: list[str]
+    ) -> tuple[str, str]:
+        """Return the CREATE statement for the chunk's label and its parameters."""
+        sql = CREATE_VERTEX_SQL[_label_for(chunk_type)]
+        params = _params(
+            chunk_id=chunk_id,
+            text=text[:500],
+            entities=entities[:10],
+            project_id=self.project_id,
+        )
+        return sql, params
+
+    def _cached_session_vertex(self, session_id: str) -> int | None:
+        key = (self.project_id, session_id)
+        vid = _SESSION_VIDS.get(key)
+        if vid is not None:
+            _SESSION_VIDS.move_to_end(key)
+        return vid
+
+    def remember_session_vertex(self, session_id: str, vid: int | None) -> int | None:
+        """Cache a session vertex id once the statement or transaction creating it committed."""
+        if vid is None:
+            return None
+        _SESSION_VIDS[(self.project_id, session_id)] = vid
+        if len(_SESSION_VIDS) > SESSION_VID_CACHE_SIZE:
+            _SESSION_VIDS.popitem(last=False)
+        return vid
 
     async def ensure_session_vertex(self, session_id: str) -> int | None:
         """Create or find a Session vertex, return its id."""
-        safe_id = _escape(session_id)
-        safe_proj = _escape(self.project_id)
-        cypher = (
-            f"MERGE (s:Session {{session_id: '{safe_id}', project_id: '{safe_proj}'}}) RETURN id(s)"
-        )
-        rows = await self._execute_cypher(cypher, "vid agtype")
-        if rows:
-            return _parse_agtype_id(rows[0]["vid"])
-        return None
+        vid = self._cached_session_vertex(session_id)
+        if vid is not None:
+            return vid
+        params = _params(session_id=session_id, project_id=self.project_id)
+        rows = await self._execute_cypher(MERGE_SESSION_SQL, params)
+        return self.remember_session_vertex(session_id, rows[0]["vid"] if rows else None)
+
+    async def ensure_session_vertex_in_tx(
+        self, conn: asyncpg.Connection, session_id: str
+    ) -> int | None:
+        """Create or find a Session vertex within an existing transaction.
+
+        The id is not cached here: a MERGE rolled back with the transaction would leave a
+        dangling id. Callers pass it to remember_session_vertex() after the commit.
+        """
+        vid = self._cached_session_vertex(session_id)
+        if vid is not None:
+            return vid
+        params = _params(session_id=session_id, project_id=self.project_id)
+        rows = await self._execute_cypher_in_tx(conn, MERGE_SESSION_SQL, params)
+        return rows[0]["vid"] if rows else None
 
     async def create_vertex(
         self,
@@ -99,23 +297,10 @@ class KnowledgeGraph:
         entities: list[str],
     ) -> int | None:
         """Create a knowledge vertex and return its graph id."""
-        label = chunk_type.capitalize()
-        # Validate label exists in our schema
-        valid_labels = {"Decision", "Correction", "Constraint", "Pattern", "Fact"}
-        if label not in valid_labels:
-            label = "Pattern"
-
-        safe_text = _escape(text[:500])
-        entity_str = ", ".join(f"'{_escape(e)}'" for e in entities[:10])
-
-        cypher = (
-            f"CREATE (n:{label} {{chunk_id: {chunk_id}, text: '{safe_text}', "
-            f"entities: [{entity_str}], project_id: '{_escape(self.project_id)}'}}) "
-            f"RETURN id(n)"
-        )
-        rows = await self._execute_cypher(cypher, "vid agtype")
+        self._version += 1
+        rows = await self._execute_cypher(*self._vertex_args(chunk_id, chunk_type, text, entities))
         if rows:
-            return _parse_agtype_id(rows[0]["vid"])
+            return rows[0]["vid"]
         return None
 
     async def create_vertex_in_tx(
@@ -127,109 +312,103 @@ class KnowledgeGraph:
         entities: list[str],
     ) -> int | None:
         """Create a vertex within an existing transaction."""
-        label = chunk_type.capitalize()
-        valid_labels = {"Decision", "Correction", "Constraint", "Pattern", "Fact"}
-        if label not in valid_labels:
-            label = "Pattern"
-
-        safe_text = _escape(text[:500])
-        entity_str = ", ".join(f"'{_escape(e)}'" for e in entities[:10])
-
-        cypher = (
-            f"CREATE (n:{label} {{chunk_id: {chunk_id}, text: '{safe_text}', "
-            f"entities: [{entity_str}], project_id: '{_escape(self.project_id)}'}}) "
-            f"RETURN id(n)"
+        self._version += 1
+        rows = await self._execute_cypher_in_tx(
+            conn, *self._vertex_args(chunk_id, chunk_type, text, entities)
         )
-        rows = await self._execute_cypher_in_tx(conn, cypher, "vid agtype")
         if rows:
-            return _parse_agtype_id(rows[0]["vid"])
+            return rows[0]["vid"]
         return None
 
+    async def create_vertices_in_tx(
+        self, conn: asyncpg.Connection, chunks: list[tuple[int, str, str, list[str]]]
+    ) -> list[int | None]:
+        """Create a vertex per (chunk_id, chunk_type, text, entities), one query per label.
+
+        Returns the vertex ids in input order (None where no vertex was returned).
+        """
+        self._version += 1
+        by_label: dict[str, list[dict[str, Any]]] = {}
+        for idx, (chunk_id, chunk_type, text, entities) in enumerate(chunks):
+            by_label.setdefault(_label_for(chunk_type), []).append(
+                {"idx": idx, "chunk_id": chunk_id, "text": text[:500], "entities": entities[:10]}
+            )
+
+        vertex_ids: list[int | None] = [None] * len(chunks)
+        for label, rows in by_label.items():
+            params = _params(rows=rows, project_id=self.project_id)
+            for row in await self._execute_cypher_in_tx(conn, CREATE_VERTICES_SQL[label], params):
+                vertex_ids[row["idx"]] = row["vid"]
+        return vertex_ids
+
+    async def create_edges_in_tx(
+        self, conn: asyncpg.Connection, edges: list[tuple[int, int, str]]
+    ) -> None:
+        """Create (from_vertex_id, to_vertex_id, edge_type) edges, one query per edge type."""
+        self._version += 1
+        by_type: dict[str, list[dict[str, int]]] = {}
+        for from_id, to_id, edge_type in edges:
+            if edge_type in CREATE_EDGES_SQL:
+                by_type.setdefault(edge_type, []).append({"from_id": from_id, "to_id": to_id})
+        for edge_type, rows in by_type.items():
+            await self._write_cypher_in_tx(conn, CREATE_EDGES_SQL[edge_type], _params(edges=rows))
+
     async def create_edge(self, from_vertex_id: int, to_vertex_id: int, edge_type: str) -> None:
         """Create an edge between two vertices."""
-        valid_edges = {
-            "CONTRADICTS",
-            "SUPERSEDES",
-            "DEPENDS_ON",
-            "REJECTED_IN_FAVOR_OF",
-            "DISCOVERED_IN",
-            "CAUSED_BY",
-        }
-        if edge_type not in valid_edges:
+        self._version += 1
+        sql = CREATE_EDGE_SQL.get(edge_type)
+        if sql is None:
             return
-
-        cypher = (
-            f"MATCH (a), (b) WHERE id(a) = {from_vertex_id} AND id(b) = {to_vertex_id} "
-            f"CREATE (a)-[:{edge_type}]->(b)"
-        )
-        await self._execute_cypher(cypher, "dummy agtype")
+        await self._write_cypher(sql, _params(from_id=from_vertex_id, to_id=to_vertex_id))
 
     async def create_edge_in_tx(
         self, conn: asyncpg.Connection, from_vertex_id: int, to_vertex_id: int, edge_type: str
     ) -> None:
         """Create an edge within an existing transaction."""
-        valid_edges = {
-            "CONTRADICTS",
-            "SUPERSEDES",
-            "DEPENDS_ON",
-            "REJECTED_IN_FAVOR_OF",
-            "DISCOVERED_IN",
-            "CAUSED_BY",
-        }
-        if edge_type not in valid_edges:
+        self._version += 1
+        sql = CREATE_EDGE_SQL.get(edge_type)
+        if sql is None:
             return
-
-        cypher = (
-            f"MATCH (a), (b) WHERE id(a) = {from_vertex_id} AND id(b) = {to_vertex_id} "
-            f"CREATE (a)-[:{edge_type}]->(b)"
+        await self._write_cypher_in_tx(
+            conn, sql, _params(from_id=from_vertex_id, to_id=to_vertex_id)
         )
-        await self._execute_cypher_in_tx(conn, cypher, "dummy agtype")
 
     async def link_to_session(self, chunk_vertex_id: int, session_id: str) -> None:
         """Link a knowledge vertex to its source session."""
         session_vid = await self.ensure_session_vertex(session_id)
         if session_vid is None:
             return
-        cypher = (
-            f"MATCH (c), (s) WHERE id(c) = {chunk_vertex_id} AND id(s) = {session_vid} "
-            f"CREATE (c)-[:DISCOVERED_IN]->(s)"
-        )
-        await self._execute_cypher(cypher, "dummy agtype")
+        await self.create_edge(chunk_vertex_id, session_vid, "DISCOVERED_IN")
 
     async def link_to_session_in_tx(
         self, conn: asyncpg.Connection, chunk_vertex_id: int, session_vid: int
     ) -> None:
         """Link a vertex to session within a transaction."""
-        cypher = (
-            f"MATCH (c), (s) WHERE id(c) = {chunk_vertex_id} AND id(s) = {session_vid} "
-            f"CREATE (c)-[:DISCOVERED_IN]->(s)"
-        )
-        await self._execute_cypher_in_tx(conn, cypher, "dummy agtype")
+        await self.create_edge_in_tx(conn, chunk_vertex_id, session_vid, "DISCOVERED_IN")
 
     async def find_contradictions(self, entities: list[str]) -> list[dict[str, Any]]:
         """Find CONTRADICTS edges involving the given entities."""
         if not entities:
             return []
+        # The sorted seed tuple is both the cache key and the query parameter
+        seeds = tuple(sorted(entities[:5]))
+        return await self._memoized(
+            ("contradictions", seeds), lambda: self._find_contradictions(seeds)
+        )
 
+    async def _find_contradictions(self, seeds: tuple[str, ...]) -> list[dict[str, Any]]:
         # Match vertices that share entities with the query, then traverse CONTRADICTS edges
-        entity_conditions = " OR ".join(f"'{_escape(e)}' IN n.entities" for e in entities[:5])
-        cypher = (
-            f"MATCH (n)-[:CONTRADICTS]-(m) "
-            f"WHERE ({entity_conditions}) AND n.project_id = '{_escape(self.project_id)}' "
-            f"RETURN n.text, m.text, n.chunk_id, m.chunk_id LIMIT 10"
-        )
-        rows = await self._execute_cypher(
-            cypher, "text1 agtype, text2 agtype, id1 agtype, id2 agtype"
-        )
+        params = _params(entities=seeds, project_id=self.project_id)
+        rows = await self._execute_cypher(FIND_CONTRADICTIONS_SQL, params)
 
         results = []
         for row in rows:
             results.append(
                 {
-                    "statement_a": str(row["text1"]).strip('"'),
-                    "statement_b": str(row["text2"]).strip('"'),
-                    "chunk_id_a": _parse_agtype_id(row["id1"]),
-                    "chunk_id_b": _parse_agtype_id(row["id2"]),
+                    "statement_a": row["text1"],
+                    "statement_b": row["text2"],
+                    "chunk_id_a": row["id1"],
+                    "chunk_id_b": row["id2"],
                 }
             )
         return results
@@ -238,24 +417,19 @@ class KnowledgeGraph:
         """Multi-hop traversal: find chunks related to the given entities."""
         if not entities:
             return []
-
-        entity_conditions = " OR ".join(f"'{_escape(e)}' IN n.entities" for e in entities[:5])
-        # 1-2 hop traversal for related knowledge
-        cypher = (
-            f"MATCH (n)-[*1..2]-(m) "
-            f"WHERE ({entity_conditions}) AND n.project_id = '{_escape(self.project_id)}' "
-            f"AND m.chunk_id IS NOT NULL "
-            f"WITH DISTINCT m.chunk_id AS chunk_id, "
-            f"count(*) AS path_count "
-            f"RETURN chunk_id, path_count "
-            f"ORDER BY path_count DESC LIMIT {limit}"
+        seeds = tuple(sorted(entities[:5]))
+        return await self._memoized(
+            ("related", seeds, limit), lambda: self._retrieve_related(seeds, int(limit))
         )
-        rows = await self._execute_cypher(cypher, "chunk_id agtype, path_count agtype")
 
-        results = []
-        for row in rows:
-            cid = _parse_agtype_id(row["chunk_id"])
-            score = _parse_agtype_float(row["path_count"])
-            if cid is not None:
-                results.append({"chunk_id": cid, "path_score": score})
-        return results
+    async def _retrieve_related(self, seeds: tuple[str, ...], limit: int) -> list[dict[str, Any]]:
+        # 1-2 hop traversal for related knowledge
+        params = _params(entities=seeds, project_id=self.project_id)
+        rows = await self._execute_cypher(_retrieve_related_sql(limit), params)
+
+        # The agtype codec already yields ints for both columns (count(*) is an integer)
+        return [
+            {"chunk_id": row["chunk_id"], "path_score": row["path_count"]}
+            for row in rows
+            if row["chunk_id"] is not None
+        ]
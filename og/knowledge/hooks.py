@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING
 
@@ -14,12 +15,17 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
-INSERT_CHUNK_SQL = """
+# One statement for the whole batch. Texts must be unique within a batch (ON CONFLICT DO
+# UPDATE cannot touch the same row twice), so RETURNING text maps ids back to chunks.
+# unnest needs a typed array: vector[] keeps the embeddings at full precision for a vector
+# column, and pgvector's vector-to-halfvec cast narrows them for the default halfvec one.
+INSERT_CHUNKS_SQL = """
 INSERT INTO context_chunks (project_id, chunk_type, text, embedding, source_session, source_type)
-VALUES ($1, $2, $3, $4::vector, $5, 'pre_compact')
-ON CONFLICT (project_id, md5(text))
+SELECT $1, t.chunk_type, t.text, t.embedding, $5, 'pre_compact'
+FROM unnest($2::text[], $3::text[], $4::vector[]) AS t(chunk_type, text, embedding)
+ON CONFLICT (project_id, text_md5)
 DO UPDATE SET last_accessed = now(), access_count = context_chunks.access_count + 1
-RETURNING id;
+RETURNING id, text;
 """
 
 
@@ -50,88 +56,83 @@ class PreCompactHook:
         if not chunks:
             return 0
 
-        # 2. Batch embed all chunk texts
+        # 2. Batch embed all chunk texts, overlapped with the transaction setup below
         texts = [c.text for c in chunks]
-        try:
-            embeddings = await self.embedder.embed_batch(texts)
-        except Exception:
-            logger.warning("Batch embedding failed for knowledge chunks", exc_info=True)
-            return 0
+        embed_task = asyncio.create_task(self.embedder.embed_batch(texts))
 
         # 3. Store chunks + create graph vertices in a transaction
         stored_count = 0
-        chunk_db_ids: list[int | None] = []
-        vertex_ids: list[int | None] = []
+        session_vid = None
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self.pool.acquire() as conn, conn.transaction():
+                # Ensure session vertex exists (needs no embeddings)
+                session_vid = await self.graph.ensure_session_vertex_in_tx(conn, session_id)
+
                 try:
-                    await conn.execute("LOAD 'age';")
+                    embeddings = await embed_task
                 except Exception:
-                    pass  # Already loaded via shared_preload_libraries
-                await conn.execute("SET search_path = ag_catalog, public;")
-
-                async with conn.transaction():
-                    # Ensure session vertex exists
-                    from og.knowledge.graph import _escape, _cypher_query
-
-                    safe_id = _escape(session_id)
-                    safe_proj = _escape(self.project_id)
-                    cypher = (
-                        f"MERGE (s:Session {{session_id: '{safe_id}', "
-                        f"project_id: '{safe_proj}'}}) RETURN id(s)"
-                    )
-                    sql = _cypher_query(cypher, "vid agtype")
-                    rows = await conn.fetch(sql)
-                    from og.knowledge.graph import _parse_agtype_id
-
-                    session_vid = _parse_agtype_id(rows[0]["vid"]) if rows else None
-
-                    for i, chunk in enumerate(chunks):
-                        # Insert into context_chunks
-                        row = await conn.fetchrow(
-                            INSERT_CHUNK_SQL,
-                            self.project_id,
-                            chunk.chunk_type,
-                            chunk.text,
-                            str(embeddings[i]),
-                            session_id,
-                        )
-                        chunk_id = row["id"] if row else None
+                    logger.warning("Batch embedding failed for knowledge chunks", exc_info=True)
+                    return 0
+
+                # Insert into context_chunks, repeated texts once (they share a row)
+                first: dict[str, int] = {}
+                for i, chunk in enumerate(chunks):
+                    first.setdefault(chunk.text, i)
+                rows = await conn.fetch(
+                    INSERT_CHUNKS_SQL,
+                    self.project_id,
+                    [chunks[i].chunk_type for i in first.values()],
+                    list(first),
+                    [embeddings[i] for i in first.values()],
+                    session_id,
+                )
+                ids_by_text = {row["text"]: row["id"] for row in rows}
+                stored: list[int] = []  # indexes into chunks
+                chunk_db_ids: list[int] = []
+                for i, chunk in enumerate(chunks):
+                    chunk_id = ids_by_text.get(chunk.text)
+                    if chunk_id is not None:
+                        stored.append(i)
                         chunk_db_ids.append(chunk_id)
-
-                        if chunk_id is not None:
-                            stored_count += 1
-
-                            # Create graph vertex
-                            vid = await self.graph.create_vertex_in_tx(
-                                conn, chunk_id, chunk.chunk_type, chunk.text, chunk.entities
+                stored_count = len(stored)
+
+                # Create graph vertices, batched per label
+                vertex_ids: list[int | None] = [None] * len(chunks)
+                created = await self.graph.create_vertices_in_tx(
+                    conn,
+                    [
+                        (chunk_id, chunks[i].chunk_type, chunks[i].text, chunks[i].entities)
+                        for i, chunk_id in zip(stored, chunk_db_ids)
+                    ],
+                )
+                for i, vid in zip(stored, created):
+                    vertex_ids[i] = vid
+
+                # 4. Link to session and create inter-chunk edges, batched per edge type
+                edges: list[tuple[int, int, str]] = []
+                if session_vid is not None:
+                    edges.extend(
+                        (vid, session_vid, "DISCOVERED_IN") for vid in vertex_ids if vid is not None
+                    )
+                for i, chunk in enumerate(chunks):
+                    if vertex_ids[i] is None or not chunk.relation_type:
+                        continue
+                    for related_idx in chunk.related_to:
+                        if (
+                            0 <= related_idx < len(vertex_ids)
+                            and vertex_ids[related_idx] is not None
+                        ):
+                            edges.append(
+                                (vertex_ids[i], vertex_ids[related_idx], chunk.relation_type)
                             )
-                            vertex_ids.append(vid)
-
-                            # Link to session
-                            if vid is not None and session_vid is not None:
-                                await self.graph.link_to_session_in_tx(conn, vid, session_vid)
-                        else:
-                            vertex_ids.append(None)
-
-                    # 4. Create inter-chunk edges
-                    for i, chunk in enumerate(chunks):
-                        if vertex_ids[i] is None or not chunk.relation_type:
-                            continue
-                        for related_idx in chunk.related_to:
-                            if (
-                                0 <= related_idx < len(vertex_ids)
-                                and vertex_ids[related_idx] is not None
-                            ):
-                                await self.graph.create_edge_in_tx(
-                                    conn,
-                                    vertex_ids[i],
-                                    vertex_ids[related_idx],
-                                    chunk.relation_type,
-                                )
+                await self.graph.create_edges_in_tx(conn, edges)
 
+            # Cached only now that the transaction that MERGEd it has committed
+            self.graph.remember_session_vertex(session_id, session_vid)
         except Exception:
             logger.warning("PreCompactHook transaction failed", exc_info=True)
+        finally:
+            embed_task.cancel()  # no-op once awaited; stops it if the DB side failed first
 
         return stored_count
@@ -4,11 +4,16 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from typing import TYPE_CHECKING
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
+if TYPE_CHECKING:
+    from og.knowledge.graph import KnowledgeGraph
+    from og.memory.pg import PgMemory
+
 logger = logging.getLogger(__name__)
 
 CONTEXT_RECALL_TOOL = Tool(
@@ -88,8 +93,8 @@ CONTEXT_STORE_TOOL = Tool(
 
 INSERT_CHUNK_SQL = """
 INSERT INTO context_chunks (project_id, chunk_type, text, embedding, source_session, source_type)
-VALUES ($1, $2, $3, $4::vector, $5, 'mcp')
-ON CONFLICT (project_id, md5(text)) DO NOTHING
+VALUES ($1, $2, $3, $4, $5, 'mcp')
+ON CONFLICT (project_id, text_md5) DO NOTHING
 RETURNING id;
 """
 
@@ -101,9 +106,46 @@ class ContextMCPServer:
         self.pool = None
         self.embedder = None
         self.graph = None
+        self.stored = None  # StoredChunks, set in initialize()
+        self.keyword_index = "tsvector"
+        self.fts_config = "english"
+        self.semantic_index = "full"
+        self.embed_timeout = 1.0
+        # Per-project graph and memory objects, reused across tool calls so their caches hit
+        self._graphs: dict[str, KnowledgeGraph] = {}
+        self._memories: dict[str, PgMemory] = {}
         self.server = Server("og-context")
         self._setup_handlers()
 
+    def _graph_for(self, project_id: str) -> KnowledgeGraph | None:
+        """Return the shared KnowledgeGraph for a project, or None without a graph."""
+        if self.graph is None:
+            return None
+        graph = self._graphs.get(project_id)
+        if graph is None:
+            from og.knowledge.graph import KnowledgeGraph
+
+            graph = self._graphs[project_id] = KnowledgeGraph(pool=self.pool, project_id=project_id)
+        return graph
+
+    def _memory_for(self, project_id: str) -> PgMemory:
+        """Return the shared PgMemory for a project."""
+        memory = self._memories.get(project_id)
+        if memory is None:
+            from og.memory.pg import PgMemory
+
+            memory = self._memories[project_id] = PgMemory(
+                pool=self.pool,
+                embedder=self.embedder,
+                project_id=project_id,
+                graph=self._graph_for(project_id),
+                keyword_index=self.keyword_index,
+                fts_config=self.fts_config,
+                semantic_index=self.semantic_index,
+                embed_timeout=self.embed_timeout,
+            )
+        return memory
+
     def _setup_handlers(self):
         @self.server.list_tools()
         async def list_tools():
@@ -131,18 +173,35 @@ class ContextMCPServer:
         import asyncpg
         from pgvector.asyncpg import register_vector
 
+        from og.knowledge.graph import AGE_SERVER_SETTINGS, load_age
         from og.memory.embeddings import EmbeddingClient
+        from og.memory.pg import StoredChunks
+
+        async def init_conn(conn: asyncpg.Connection) -> None:
+            await register_vector(conn)
+            await load_age(conn)
 
         self.pool = await asyncpg.create_pool(
             dsn=config.db.dsn,
-            min_size=1,
-            max_size=5,
-            init=lambda conn: register_vector(conn),
+            min_size=config.db.min_pool,
+            max_size=config.db.max_pool,
+            command_timeout=config.db.command_timeout,
+            max_inactive_connection_lifetime=300,
+            init=init_conn,
+            server_settings=AGE_SERVER_SETTINGS,
         )
+        logger.info("MCP pool: min_size=%d max_size=%d", config.db.min_pool, config.db.max_pool)
         self.embedder = EmbeddingClient(
             base_url=config.embedding.ollama_base_url,
             model=config.embedding.model,
+            concurrency=config.embedding.concurrency,
+            batch_chunk_size=config.embedding.batch_chunk_size,
         )
+        self.stored = StoredChunks()
+        self.keyword_index = config.db.keyword_index
+        self.fts_config = config.db.fts_config
+        self.semantic_index = config.db.semantic_index
+        self.embed_timeout = config.embedding.query_timeout
         # Quick connectivity check
         await self.embedder.embed("mcp init")
         logger.info("MCP server connected to PostgreSQL and embedding service")
@@ -172,20 +231,7 @@ class ContextMCPServer:
             return [TextContent(type="text", text="Error: query is required")]
 
         try:
-            from og.memory.pg import PgMemory
-
-            graph = None
-            if self.graph is not None:
-                from og.knowledge.graph import KnowledgeGraph
-
-                graph = KnowledgeGraph(pool=self.pool, project_id=project_id)
-
-            memory = PgMemory(
-                pool=self.pool,
-                embedder=self.embedder,
-                project_id=project_id,
-                graph=graph,
-            )
+            memory = self._memory_for(project_id)
             results = await memory.search(query, limit=limit, entities=entities or None)
 
             if not results:
@@ -207,6 +253,15 @@ class ContextMCPServer:
 
         if not text:
             return [TextContent(type="text", text="Error: text is required")]
+        # Known duplicates skip the embedding request and the no-op insert
+        if (project_id, text) in self.stored:
+            return [TextContent(type="text", text="Chunk already exists (deduplicated).")]
+
+        graph = self._graph_for(project_id) if entities else None
+        session_task = None
+        if graph is not None and session_id:
+            # The session vertex doesn't depend on the chunk: resolve it while embedding
+            session_task = asyncio.create_task(graph.ensure_session_vertex(session_id))
 
         try:
             embedding = await self.embedder.embed(text)
@@ -221,17 +276,16 @@ class ContextMCPServer:
             )
 
             chunk_id = row["id"] if row else None
+            self.stored.add(project_id, text)
             if chunk_id is None:
                 return [TextContent(type="text", text="Chunk already exists (deduplicated).")]
 
             # Create graph vertex if graph is available and entities are provided
-            if self.graph is not None and entities:
-                from og.knowledge.graph import KnowledgeGraph
-
-                graph = KnowledgeGraph(pool=self.pool, project_id=project_id)
+            if graph is not None:
                 vid = await graph.create_vertex(chunk_id, chunk_type, text, entities)
-                if vid is not None and session_id:
-                    await graph.link_to_session(vid, session_id)
+                session_vid = await session_task if session_task is not None else None
+                if vid is not None and session_vid is not None:
+                    await graph.create_edge(vid, session_vid, "DISCOVERED_IN")
                 return [
                     TextContent(
                         type="text",
@@ -243,6 +297,11 @@ class ContextMCPServer:
         except Exception as e:
             logger.warning("context_store failed", exc_info=True)
             return [TextContent(type="text", text=f"Error: {e}")]
+        finally:
+            # Dedup and errors return before it is awaited; cancel it and retrieve the outcome
+            if session_task is not None:
+                session_task.cancel()
+                await asyncio.gather(session_task, return_exceptions=True)
 
 
 async def run_mcp_server():
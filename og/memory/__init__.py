@@ -1,7 +1,28 @@
 """Memory subsystem: flat-file and PostgreSQL backends."""
 
-from og.memory.embeddings import EmbeddingClient
-from og.memory.manager import Memory
-from og.memory.pg import PgMemory
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from og.memory.embeddings import EmbeddingClient
+    from og.memory.manager import Memory
+    from og.memory.pg import PgMemory
 
 __all__ = ["EmbeddingClient", "Memory", "PgMemory"]
+
+# Resolved on first attribute access so importing og.memory.manager (the flat-file
+# fallback) does not pull in the OpenAI SDK via og.memory.embeddings.
+_LAZY = {
+    "EmbeddingClient": "og.memory.embeddings",
+    "Memory": "og.memory.manager",
+    "PgMemory": "og.memory.pg",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
@@ -2,22 +2,61 @@
 
 from __future__ import annotations
 
-from openai import AsyncOpenAI
+import asyncio
+import base64
+
+import httpx
+import numpy as np
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 
 class EmbeddingClient:
     """Async embedding client wrapping Ollama's OpenAI-compatible endpoint."""
 
-    def __init__(self, base_url: str, model: str):
+    def __init__(self, base_url: str, model: str, concurrency: int = 8, batch_chunk_size: int = 64):
         self.model = model
-        self._client = AsyncOpenAI(base_url=base_url, api_key="ollama")
+        self.batch_chunk_size = max(1, batch_chunk_size)
+        # Concurrent embed() calls each get their own keep-alive connection rather than
+        # queueing behind one socket
+        self._client = AsyncOpenAI(
+            base_url=base_url,
+            api_key="ollama",
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=concurrency, max_keepalive_connections=concurrency
+                ),
+                timeout=30,
+            ),
+        )
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed a single text string as a float32 array."""
+        return (await self._embed_chunk([text]))[0]
+
+    async def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed a batch of text strings as a (len(texts), dim) float32 array.
+
+        Large batches are split into parallel requests. Rows bind directly to pgvector
+        ``halfvec`` parameters on connections set up with ``register_vector``.
+        """
+        size = self.batch_chunk_size
+        if len(texts) <= size:
+            return await self._embed_chunk(texts)
+        chunks = await asyncio.gather(
+            *(self._embed_chunk(texts[i : i + size]) for i in range(0, len(texts), size))
+        )
+        return np.concatenate(chunks)
+
+    async def _embed_chunk(self, texts: list[str]) -> np.ndarray:
+        # base64 responses decode straight into the array, with no per-float Python objects
+        resp = await self._client.embeddings.create(
+            model=self.model, input=texts, encoding_format="base64"
+        )
+        return np.stack([_as_array(item.embedding) for item in resp.data])
 
-    async def embed(self, text: str) -> list[float]:
-        """Embed a single text string."""
-        resp = await self._client.embeddings.create(model=self.model, input=text)
-        return resp.data[0].embedding
 
-    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        """Embed a batch of text strings."""
-        resp = await self._client.embeddings.create(model=self.model, input=texts)
-        return [item.embedding for item in resp.data]
+def _as_array(embedding: str | list[float]) -> np.ndarray:
+    """Decode a base64 float32 embedding (or a plain float list from older servers)."""
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+    return np.asarray(embedding, dtype=np.float32)
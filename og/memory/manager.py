@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
+from typing import TextIO
 
 
 class Memory:
@@ -15,39 +20,91 @@ class Memory:
         self.daily_dir = self.storage_dir / daily_dir
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.daily_dir.mkdir(parents=True, exist_ok=True)
+        # path -> ((mtime_ns, size), text); files are re-read only when they change
+        self._files: dict[Path, tuple[tuple[int, int], str]] = {}
+        # (date, handle) of the open daily log; line-buffered so each entry reaches the file
+        self._log_handle: tuple[str, TextIO] | None = None
+        # log() writes from worker threads; the lock serializes writes and day rollover
+        self._log_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _load_file(self, path: Path) -> str | None:
+        """Return a file's text, re-reading it only when its mtime or size changed."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._files.pop(path, None)
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._files.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, path.read_text(encoding="utf-8"))
+            self._files[path] = cached
+        return cached[1]
 
     async def search(self, query: str, limit: int = 5) -> list[str]:
         """Keyword search across MEMORY.md and recent daily logs."""
+        keywords = query.split()
+        if not keywords or limit <= 0:
+            return []
+        # One case-insensitive pass per file; line bounds are only computed around hits
+        pattern = re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
         results = []
-        query_lower = query.lower()
-        keywords = query_lower.split()
-
-        # Search MEMORY.md
-        if self.memory_path.exists():
-            for line in self.memory_path.read_text(encoding="utf-8").splitlines():
-                if any(kw in line.lower() for kw in keywords):
-                    results.append(f"[memory] {line.strip()}")
 
-        # Search recent daily logs (last 7 days of files)
+        # Search MEMORY.md, then recent daily logs (last 7 days of files)
         log_files = sorted(self.daily_dir.glob("*.md"), reverse=True)[:7]
-        for log_file in log_files:
-            for line in log_file.read_text(encoding="utf-8").splitlines():
-                if any(kw in line.lower() for kw in keywords):
-                    results.append(f"[{log_file.stem}] {line.strip()}")
+        sources = [("memory", self.memory_path)] + [(f.stem, f) for f in log_files]
+        for tag, path in sources:
+            text = self._load_file(path)
+            if not text:
+                continue
+            pos = 0
+            while match := pattern.search(text, pos):
+                start = text.rfind("\n", 0, match.start()) + 1
+                end = text.find("\n", match.end())
+                if end < 0:
+                    end = len(text)
+                results.append(f"[{tag}] {text[start:end].strip()}")
+                if len(results) >= limit:
+                    return results
+                pos = end + 1
 
-        return results[:limit]
+        return results
 
     async def log(self, user_msg: str, assistant_msg: str) -> None:
         """Append a conversation exchange to today's daily log."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        log_path = self.daily_dir / f"{today}.md"
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        await asyncio.to_thread(self._log_sync, user_msg, assistant_msg)
+
+    def _log_sync(self, user_msg: str, assistant_msg: str) -> None:
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        timestamp = now.strftime("%H:%M:%S")
         entry = f"\n## {timestamp}\n\n**User:** {user_msg[:200]}\n\n**Assistant:** {assistant_msg[:500]}\n"
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(entry)
+        with self._log_lock:
+            if self._log_handle is None or self._log_handle[0] != today:
+                self._close_log()
+                f = open(self.daily_dir / f"{today}.md", "a", encoding="utf-8", buffering=1)
+                self._log_handle = (today, f)
+            self._log_handle[1].write(entry)
+
+    async def flush(self) -> None:
+        """No-op: the daily log is line-buffered, so entries are already written."""
+
+    def close(self) -> None:
+        """Close the open daily log file, if any."""
+        with self._log_lock:
+            self._close_log()
+
+    def _close_log(self) -> None:
+        if self._log_handle is not None:
+            self._log_handle[1].close()
+            self._log_handle = None
 
     async def save_fact(self, fact: str) -> None:
         """Append a fact to MEMORY.md."""
+        await asyncio.to_thread(self._save_fact_sync, fact)
+
+    def _save_fact_sync(self, fact: str) -> None:
         with open(self.memory_path, "a", encoding="utf-8") as f:
             f.write(f"- {fact}\n")
 
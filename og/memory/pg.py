@@ -2,68 +2,141 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import time
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     import asyncpg
+    import numpy as np
 
     from og.knowledge.graph import KnowledgeGraph
     from og.memory.embeddings import EmbeddingClient
 
 logger = logging.getLogger(__name__)
 
-DUAL_SEARCH_SQL = """
-WITH semantic AS (
-    SELECT id, text, ROW_NUMBER() OVER (ORDER BY embedding <=> $1::vector) AS rank_s
-    FROM context_chunks WHERE project_id = $3 AND embedding IS NOT NULL
-    ORDER BY embedding <=> $1::vector LIMIT 30
-),
-keyword AS (
-    SELECT id, text, ROW_NUMBER() OVER (ORDER BY ts_rank_cd(text_search, q) DESC) AS rank_k
-    FROM context_chunks, websearch_to_tsquery('english', $2) q
-    WHERE text_search @@ q AND project_id = $3 LIMIT 30
-),
-fused AS (
-    SELECT COALESCE(s.id, k.id) AS id, COALESCE(s.text, k.text) AS text,
-           COALESCE(1.0/(s.rank_s+60),0) + COALESCE(1.0/(k.rank_k+60),0) AS rrf
-    FROM semantic s FULL OUTER JOIN keyword k USING (id)
+# Hybrid search runs each ranking as its own query (concurrently where inputs allow) and
+# fuses them client-side with reciprocal rank fusion: score = sum(1 / (RRF_K + rank)).
+RRF_K = 60
+
+# The first query embedding of a process may wait for the model to load (Ollama unloads
+# idle models), so it is exempt from the search timeout and the failure count
+_embed_attempted = False
+
+# Embedding parameters are left uncast: Postgres types them from the column, which is
+# halfvec or vector depending on setup-db.py's OG_DB__EMBEDDING_PRECISION.
+# With pgvector 0.8's hnsw.iterative_scan = relaxed_order (also set by setup-db.py) the index
+# scan may return rows slightly out of distance order; the outer ORDER BY restores it.
+SEMANTIC_SQL = """
+WITH nearest AS MATERIALIZED (
+    SELECT id, text, embedding <=> $1 AS distance FROM context_chunks
+    WHERE project_id = $2 AND embedding IS NOT NULL
+    ORDER BY distance LIMIT 30
 )
-SELECT text FROM fused ORDER BY rrf DESC LIMIT $4;
+SELECT id, text FROM nearest ORDER BY distance;
 """
 
-TRIPLE_SEARCH_SQL = """
-WITH semantic AS (
-    SELECT id, text, ROW_NUMBER() OVER (ORDER BY embedding <=> $1::vector) AS rank_s
-    FROM context_chunks WHERE project_id = $3 AND embedding IS NOT NULL
-    ORDER BY embedding <=> $1::vector LIMIT 30
-),
-keyword AS (
-    SELECT id, text, ROW_NUMBER() OVER (ORDER BY ts_rank_cd(text_search, q) DESC) AS rank_k
-    FROM context_chunks, websearch_to_tsquery('english', $2) q
-    WHERE text_search @@ q AND project_id = $3 LIMIT 30
-),
-graph_related AS (
-    SELECT c.id, c.text, ROW_NUMBER() OVER (ORDER BY g.path_score DESC) AS rank_g
-    FROM unnest($5::bigint[], $6::float[]) AS g(chunk_id, path_score)
-    JOIN context_chunks c ON c.id = g.chunk_id WHERE c.project_id = $3 LIMIT 30
-),
-fused AS (
-    SELECT COALESCE(s.id, k.id, g.id) AS id, COALESCE(s.text, k.text, g.text) AS text,
-           COALESCE(1.0/(s.rank_s+60),0) + COALESCE(1.0/(k.rank_k+60),0)
-           + COALESCE(1.0/(g.rank_g+60),0) AS rrf
-    FROM semantic s FULL OUTER JOIN keyword k USING (id) FULL OUTER JOIN graph_related g USING (id)
+# semantic_index="bit": walk the small Hamming-distance HNSW index on embedding_bit for
+# candidates, then rerank them exactly by cosine distance. $3 is the query quantized by
+# _quantize(); without iterative scan, hnsw.ef_search caps the candidate count. setup-db.py
+# creates embedding_bit and its index only when run with the same OG_DB__SEMANTIC_INDEX=bit.
+BIT_SEMANTIC_SQL = """
+WITH candidates AS MATERIALIZED (
+    SELECT id FROM context_chunks
+    WHERE project_id = $2 AND embedding IS NOT NULL
+    ORDER BY embedding_bit <~> $3 LIMIT 200
 )
-SELECT text FROM fused ORDER BY rrf DESC LIMIT $4;
+SELECT c.id, c.text FROM candidates JOIN context_chunks c USING (id)
+ORDER BY c.embedding <=> $1 LIMIT 30;
 """
 
+# Keyword rankings by DatabaseConfig.keyword_index; {fts_config} is one of FTS_CONFIGS
+KEYWORD_SQL = {
+    # ts_rank_cd scores every matching row so the top 30 are the best-ranked, not the
+    # best of an arbitrary subset
+    "tsvector": """
+SELECT id, text FROM context_chunks, websearch_to_tsquery('{fts_config}', $1) q
+WHERE text_search @@ q AND project_id = $2
+ORDER BY ts_rank_cd(text_search, q) DESC LIMIT 30;
+""",
+    # pg_search scores inside the BM25 index (idx_chunks_bm25) and returns the top rows
+    "bm25": """
+SELECT id, text FROM context_chunks
+WHERE id @@@ paradedb.match('text', $1) AND project_id = $2
+ORDER BY paradedb.score(id) DESC LIMIT 30;
+""",
+}
+
+# Text search configurations setup-db.py can generate text_search with
+FTS_CONFIGS = ("english", "simple")
+
+GRAPH_CHUNKS_SQL = """
+SELECT id, text FROM context_chunks WHERE id = ANY($1::bigint[]) AND project_id = $2;
+"""
+
+
+def _quantize(embedding: np.ndarray) -> asyncpg.BitString:
+    """Quantize like pgvector's binary_quantize(): one bit per dimension, set where > 0."""
+    import asyncpg
+    import numpy as np
+
+    return asyncpg.BitString.frombytes(np.packbits(embedding > 0).tobytes(), len(embedding))
+
+
+def _rrf(rankings: list[list[tuple[int, str]]], limit: int) -> list[str]:
+    """Fuse ranked (id, text) lists by reciprocal rank and return the top texts."""
+    scores: dict[int, float] = {}
+    texts: dict[int, str] = {}
+    for ranking in rankings:
+        for rank, (chunk_id, text) in enumerate(ranking, 1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+            texts.setdefault(chunk_id, text)
+    best = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+    return [texts[chunk_id] for chunk_id in best]
+
+
 INSERT_CHUNK_SQL = """
 INSERT INTO context_chunks (project_id, chunk_type, text, embedding, source_type)
-VALUES ($1, $2, $3, $4::vector, $5)
-ON CONFLICT (project_id, md5(text)) DO NOTHING;
+VALUES ($1, $2, $3, $4, $5)
+ON CONFLICT (project_id, text_md5) DO NOTHING;
 """
 
 
+class StoredChunks:
+    """Bounded record of (project_id, text_md5) pairs known to be in context_chunks.
+
+    Mirrors the uq_chunk_text_md5 dedup key (the same 16-byte digest), so a hit means an
+    ON CONFLICT DO NOTHING insert would be a no-op and both the embedding request and the
+    insert can be skipped.
+    Chunks are never deleted, so entries cannot go stale.
+    """
+
+    MAX_ENTRIES = 10_000
+
+    def __init__(self):
+        self._keys: OrderedDict[tuple[str, bytes], None] = OrderedDict()
+
+    @staticmethod
+    def _key(project_id: str, text: str) -> tuple[str, bytes]:
+        return project_id, hashlib.md5(text.encode(), usedforsecurity=False).digest()
+
+    def __contains__(self, item: tuple[str, str]) -> bool:
+        key = self._key(*item)
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return False
+
+    def add(self, project_id: str, text: str) -> None:
+        """Record that a chunk with this text is stored for the project."""
+        self._keys[self._key(project_id, text)] = None
+        if len(self._keys) > self.MAX_ENTRIES:
+            self._keys.popitem(last=False)
+
+
 class PgMemory:
     """PostgreSQL + pgvector memory store with hybrid semantic/keyword search.
 
@@ -71,79 +144,185 @@ class PgMemory:
     (semantic + keyword + graph) when a KnowledgeGraph is available.
     """
 
+    EMBED_CACHE_SIZE = 1024
+    # log()/save_fact() rows are queued and written in batches: one embed_batch() request
+    # and one executemany per FLUSH_ROWS rows or FLUSH_INTERVAL of waiting
+    FLUSH_ROWS = 32
+    FLUSH_INTERVAL = 0.1  # seconds
+    # search() ranks by keyword/graph alone when the query embedding takes longer than
+    # embed_timeout; after EMBED_FAILURES misses in a row it stops asking for EMBED_COOLDOWN
+    EMBED_FAILURES = 3
+    EMBED_COOLDOWN = 30.0  # seconds
+
     def __init__(
         self,
         pool: asyncpg.Pool,
         embedder: EmbeddingClient,
         project_id: str,
         graph: KnowledgeGraph | None = None,
+        keyword_index: str = "tsvector",
+        fts_config: str = "english",
+        semantic_index: str = "full",
+        embed_timeout: float = 1.0,
     ):
         self.pool = pool
+        self.embed_timeout = embed_timeout
+        # Unknown keyword_index / fts_config values fall back to the built-in tsvector ranking
+        # with the english configuration
+        self._keyword_sql = KEYWORD_SQL["bm25" if keyword_index == "bm25" else "tsvector"].format(
+            fts_config=fts_config if fts_config in FTS_CONFIGS else "english"
+        )
+        self._bit_prefilter = semantic_index == "bit"
         self.embedder = embedder
         self.project_id = project_id
         self.graph = graph
+        self._stored = StoredChunks()
+        self._queue: asyncio.Queue[tuple[str, str, str]] = asyncio.Queue()
+        self._writer: asyncio.Task | None = None
+        # blake2b(text) -> embedding future; concurrent requests for a text share one call
+        self._embeddings: OrderedDict[bytes, asyncio.Future] = OrderedDict()
+        self._embed_misses = 0
+        self._embed_skip_until = 0.0
+
+    async def _embed(self, text: str) -> np.ndarray:
+        """Embed ``text``, reusing cached or in-flight results for the same text."""
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        future = self._embeddings.get(key)
+        if future is not None:
+            self._embeddings.move_to_end(key)
+        else:
+            future = asyncio.ensure_future(self.embedder.embed(text))
+            self._embeddings[key] = future
+            if len(self._embeddings) > self.EMBED_CACHE_SIZE:
+                self._embeddings.popitem(last=False)
+
+            def _drop_failed(f: asyncio.Future) -> None:
+                # Failures are not cached: the next caller retries
+                if (f.cancelled() or f.exception() is not None) and self._embeddings.get(key) is f:
+                    del self._embeddings[key]
+
+            future.add_done_callback(_drop_failed)
+        # Shielded so one cancelled caller doesn't cancel the request others are awaiting
+        return await asyncio.shield(future)
+
+    async def _query_embedding(self, query: str) -> np.ndarray | None:
+        """Embed a search query, or return None if the embedder is slow, failing or skipped."""
+        global _embed_attempted
+        if time.monotonic() < self._embed_skip_until:
+            return None
+        first, _embed_attempted = not _embed_attempted, True
+        try:
+            if first:
+                embedding = await self._embed(query)
+            else:
+                embedding = await asyncio.wait_for(self._embed(query), self.embed_timeout)
+        except Exception:
+            logger.warning("Query embedding failed, searching without it", exc_info=True)
+            if first:
+                return None
+            self._embed_misses += 1
+            if self._embed_misses >= self.EMBED_FAILURES:
+                self._embed_misses = 0
+                self._embed_skip_until = time.monotonic() + self.EMBED_COOLDOWN
+            return None
+        self._embed_misses = 0
+        return embedding
 
     async def search(
         self, query: str, limit: int = 10, entities: list[str] | None = None
     ) -> list[str]:
         """Hybrid search with optional graph-boosted triple-modality RRF."""
+        # Keyword ranking and graph traversal don't need the query embedding: start both
+        # before embedding, then run the semantic ranking once the vector is ready
+        keyword_task = asyncio.create_task(
+            self.pool.fetch(self._keyword_sql, query, self.project_id)
+        )
+        graph_task = None
+        if self.graph is not None and entities:
+            graph_task = asyncio.create_task(self.graph.retrieve_related(entities, limit=30))
         try:
-            embedding = str(await self.embedder.embed(query))
+            rankings = []
+            embedding = await self._query_embedding(query)
+            if embedding is not None:
+                if self._bit_prefilter:
+                    args = (BIT_SEMANTIC_SQL, embedding, self.project_id, _quantize(embedding))
+                else:
+                    args = (SEMANTIC_SQL, embedding, self.project_id)
+                rankings.append(await self.pool.fetch(*args))
+            rankings.append(await keyword_task)
 
-            # Try triple-modality if graph is available and entities are provided
-            if self.graph is not None and entities:
-                graph_results = await self.graph.retrieve_related(entities, limit=30)
+            # Triple-modality when the graph finds related chunks for the entities
+            if graph_task is not None:
+                graph_results = await graph_task
                 if graph_results:
-                    chunk_ids = [r["chunk_id"] for r in graph_results]
-                    path_scores = [r["path_score"] for r in graph_results]
                     rows = await self.pool.fetch(
-                        TRIPLE_SEARCH_SQL,
-                        embedding,
-                        query,
-                        self.project_id,
-                        limit,
-                        chunk_ids,
-                        path_scores,
+                        GRAPH_CHUNKS_SQL, [r["chunk_id"] for r in graph_results], self.project_id
                     )
-                    return [row["text"] for row in rows]
+                    texts = {row["id"]: row["text"] for row in rows}
+                    ranked = sorted(graph_results, key=lambda r: r["path_score"], reverse=True)
+                    ids = [r["chunk_id"] for r in ranked]
+                    rankings.append([(cid, texts[cid]) for cid in ids if cid in texts])
 
-            # Fallback: dual-modality (semantic + keyword)
-            rows = await self.pool.fetch(DUAL_SEARCH_SQL, embedding, query, self.project_id, limit)
-            return [row["text"] for row in rows]
+            return _rrf(rankings, limit)
         except Exception:
             logger.warning("PgMemory.search failed, returning empty", exc_info=True)
             return []
+        finally:
+            # No-ops once awaited; stop them if an earlier step failed
+            keyword_task.cancel()
+            if graph_task is not None:
+                graph_task.cancel()
 
     async def log(self, user_msg: str, assistant_msg: str) -> None:
-        """Embed and store a conversation exchange."""
-        try:
-            text = f"User: {user_msg[:200]}\nAssistant: {assistant_msg[:500]}"
-            embedding = str(await self.embedder.embed(text))
-            await self.pool.execute(
-                INSERT_CHUNK_SQL,
-                self.project_id,
-                "conversation",
-                text,
-                embedding,
-                "agent_extract",
-            )
-        except Exception:
-            logger.warning("PgMemory.log failed", exc_info=True)
+        """Queue a conversation exchange to be embedded and stored."""
+        text = f"User: {user_msg[:200]}\nAssistant: {assistant_msg[:500]}"
+        self._enqueue("conversation", text, "agent_extract")
 
     async def save_fact(self, fact: str) -> None:
-        """Embed and store a fact."""
-        try:
-            embedding = str(await self.embedder.embed(fact))
-            await self.pool.execute(
-                INSERT_CHUNK_SQL,
-                self.project_id,
-                "fact",
-                fact,
-                embedding,
-                "manual",
-            )
-        except Exception:
-            logger.warning("PgMemory.save_fact failed", exc_info=True)
+        """Queue a fact to be embedded and stored."""
+        self._enqueue("fact", fact, "manual")
+
+    def _enqueue(self, chunk_type: str, text: str, source_type: str) -> None:
+        if (self.project_id, text) in self._stored:
+            return
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_batches())
+        self._queue.put_nowait((chunk_type, text, source_type))
+
+    async def flush(self) -> None:
+        """Wait until every queued log/fact row has been written."""
+        if self._writer is not None:
+            await self._queue.join()
+
+    async def _write_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.FLUSH_INTERVAL
+            while len(batch) < self.FLUSH_ROWS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            try:
+                embeddings = await self.embedder.embed_batch([text for _, text, _ in batch])
+                await self.pool.executemany(
+                    INSERT_CHUNK_SQL,
+                    [
+                        (self.project_id, chunk_type, text, embedding, source_type)
+                        for (chunk_type, text, source_type), embedding in zip(batch, embeddings)
+                    ],
+                )
+                for _, text, _ in batch:
+                    self._stored.add(self.project_id, text)
+            except Exception:
+                logger.warning("PgMemory: chunk write failed", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
 
     async def load_memory(self, message: str = "", limit: int = 10) -> str:
         """Search memory for relevant context and format as bullet list."""
@@ -1,8 +1,9 @@
 """Session persistence backends."""
 
+from og.session.sqlite import SqliteSessionStore
 from og.session.store import SessionStore, replay_events_to_messages
 
-__all__ = ["SessionStore", "replay_events_to_messages"]
+__all__ = ["SessionStore", "SqliteSessionStore", "replay_events_to_messages"]
 
 try:
     from og.session.pg import PgSessionStore  # noqa: F401
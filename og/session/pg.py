@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import time
 from typing import TYPE_CHECKING, Any
 
+import orjson
+
 from og.session.store import replay_events_to_messages
 
 if TYPE_CHECKING:
@@ -42,8 +43,9 @@ WHERE session_id = $1 AND project_id = $2
 LIMIT 1
 """
 
+# Served by the idx_events_content_trgm trigram index (see scripts/setup-db.py)
 SEARCH_SQL = """
-SELECT DISTINCT session_id, MIN(created_at) AS first_event
+SELECT session_id, MIN(created_at) AS first_event
 FROM session_events
 WHERE project_id = $1 AND content::text ILIKE '%' || $2 || '%'
 GROUP BY session_id
@@ -61,6 +63,20 @@ ORDER BY last_active DESC
 """
 
 
+def _encode_json(value: Any) -> str:
+    return orjson.dumps(value, default=str).decode()
+
+
+async def register_jsonb(conn: asyncpg.Connection) -> None:
+    """Pool ``init`` hook: (de)serialize jsonb with orjson so content arrives as dicts.
+
+    PgSessionStore requires this codec on its pool's connections.
+    """
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog", encoder=_encode_json, decoder=orjson.loads, format="text"
+    )
+
+
 class PgSessionStore:
     """PostgreSQL-backed session store with lazy loading and cross-session search."""
 
@@ -68,27 +84,40 @@ class PgSessionStore:
         self.pool = pool
         self.project_id = project_id
 
-    async def append(self, session_id: str, event: dict[str, Any]) -> None:
-        """Insert a session event into PostgreSQL."""
+    def _event_args(self, session_id: str, event: dict[str, Any]) -> tuple:
+        """Build INSERT_EVENT_SQL arguments for one event."""
         timestamp = event.get("timestamp", time.time())
         event_type = event.get("type", "unknown")
         # Store everything except 'type' and 'timestamp' in the JSONB content column
         content = {k: v for k, v in event.items() if k not in ("type", "timestamp")}
         token_count = content.pop("token_count", None)
+        return (
+            session_id,
+            self.project_id,
+            event_type,
+            content,
+            token_count,
+            timestamp,
+        )
 
+    async def append(self, session_id: str, event: dict[str, Any]) -> None:
+        """Insert a session event into PostgreSQL."""
         try:
-            await self.pool.execute(
-                INSERT_EVENT_SQL,
-                session_id,
-                self.project_id,
-                event_type,
-                json.dumps(content, default=str),
-                token_count,
-                timestamp,
-            )
+            await self.pool.execute(INSERT_EVENT_SQL, *self._event_args(session_id, event))
         except Exception:
             logger.warning("PgSessionStore.append failed", exc_info=True)
 
+    async def append_many(self, session_id: str, events: list[dict[str, Any]]) -> None:
+        """Insert several session events in one executemany round-trip."""
+        if not events:
+            return
+        try:
+            await self.pool.executemany(
+                INSERT_EVENT_SQL, [self._event_args(session_id, event) for event in events]
+            )
+        except Exception:
+            logger.warning("PgSessionStore.append_many failed", exc_info=True)
+
     async def load(self, session_id: str, limit: int | None = None) -> list[dict[str, Any]]:
         """Load session events. Use limit for lazy loading (last N events)."""
         try:
@@ -97,16 +126,8 @@ class PgSessionStore:
             else:
                 rows = await self.pool.fetch(LOAD_SQL, session_id, self.project_id)
 
-            events = []
-            for row in rows:
-                content = (
-                    json.loads(row["content"])
-                    if isinstance(row["content"], str)
-                    else row["content"]
-                )
-                event = {"type": row["event_type"], **content}
-                events.append(event)
-            return events
+            # content is decoded by the jsonb codec (register_jsonb)
+            return [{"type": row["event_type"], **row["content"]} for row in rows]
         except Exception:
             logger.warning("PgSessionStore.load failed", exc_info=True)
             return []
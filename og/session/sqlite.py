@@ -0,0 +1,104 @@
+"""SQLite session event store (WAL mode), a single-file alternative to JSONL logs."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import sqlite3
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from og.session.store import replay_events_to_messages, stamped
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS session_events (
+    session_id  TEXT    NOT NULL,
+    idx         INTEGER NOT NULL,
+    event       BLOB    NOT NULL,
+    PRIMARY KEY (session_id, idx)
+) WITHOUT ROWID;
+"""
+
+# Next idx is computed in the same statement, so appends stay ordered without a read first.
+INSERT_EVENT_SQL = """
+INSERT INTO session_events (session_id, idx, event)
+SELECT ?1, COALESCE(MAX(idx), -1) + 1, ?2 FROM session_events WHERE session_id = ?1
+"""
+
+LOAD_SQL = "SELECT event FROM session_events WHERE session_id = ? ORDER BY idx"
+
+LOAD_LAZY_SQL = """
+SELECT event FROM (
+    SELECT idx, event FROM session_events WHERE session_id = ? ORDER BY idx DESC LIMIT ?
+) ORDER BY idx
+"""
+
+EXISTS_SQL = "SELECT 1 FROM session_events WHERE session_id = ? LIMIT 1"
+
+
+class SqliteSessionStore:
+    """Session events in one SQLite database, indexed by (session_id, idx).
+
+    Runs in WAL mode with synchronous=NORMAL, so an append costs one WAL write instead of
+    an open/append per JSONL file. append_many commits a whole turn in one transaction.
+    The sqlite3 module caches the prepared statements per connection. Statements run on a
+    single worker thread, off the event loop and never interleaved with each other.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.executescript(SCHEMA_SQL)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="og-sqlite")
+        atexit.register(self.close)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def append(self, session_id: str, event: dict[str, Any]) -> None:
+        row = (session_id, orjson.dumps(stamped(event, time.time()), default=str))
+        await self._run(self._conn.execute, INSERT_EVENT_SQL, row)
+
+    async def append_many(self, session_id: str, events: list[dict[str, Any]]) -> None:
+        """Append several events in one transaction."""
+        if not events:
+            return
+        now = time.time()
+        rows = [(session_id, orjson.dumps(stamped(event, now), default=str)) for event in events]
+        await self._run(self._insert_many, rows)
+
+    def _insert_many(self, rows: list[tuple[str, bytes]]) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(INSERT_EVENT_SQL, rows)
+
+    async def load(self, session_id: str, limit: int | None = None) -> list[dict[str, Any]]:
+        if limit is not None:
+            rows = await self._run(self._fetchall, LOAD_LAZY_SQL, (session_id, limit))
+        else:
+            rows = await self._run(self._fetchall, LOAD_SQL, (session_id,))
+        return [orjson.loads(row[0]) for row in rows]
+
+    async def exists(self, session_id: str) -> bool:
+        return bool(await self._run(self._fetchall, EXISTS_SQL, (session_id,)))
+
+    def _fetchall(self, query: str, params: tuple) -> list[tuple]:
+        return self._conn.execute(query, params).fetchall()
+
+    def to_messages(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Replay events into Anthropic message format."""
+        return replay_events_to_messages(events)
+
+    def close(self) -> None:
+        """Finish queued statements and close the database."""
+        self._executor.shutdown(wait=True)
+        self._conn.close()
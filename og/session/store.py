@@ -2,10 +2,34 @@
 
 from __future__ import annotations
 
-import json
+import atexit
+import os
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
+
+import orjson
+
+
+def stamped(event: dict[str, Any], now: float) -> dict[str, Any]:
+    """Return ``event`` with a timestamp, copying rather than mutating the caller's dict.
+
+    The agent persists the same dicts it sends to the API, so stores must not add keys.
+    """
+    if "timestamp" in event:
+        return event
+    return {**event, "timestamp": now}
+
+
+def _tool_use_block(event: dict[str, Any]) -> dict[str, Any]:
+    # Older events store the block id as "tool_use_id"; newer ones persist the block as-is
+    return {
+        "type": "tool_use",
+        "id": event.get("id") or event["tool_use_id"],
+        "name": event["name"],
+        "input": event["input"],
+    }
 
 
 def replay_events_to_messages(events: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -27,28 +51,9 @@ def replay_events_to_messages(events: list[dict[str, Any]]) -> list[dict[str, An
                 if isinstance(content, str):
                     content = [{"type": "text", "text": content}] if content else []
                     messages[-1]["content"] = content
-                content.append(
-                    {
-                        "type": "tool_use",
-                        "id": event["tool_use_id"],
-                        "name": event["name"],
-                        "input": event["input"],
-                    }
-                )
+                content.append(_tool_use_block(event))
             else:
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": [
-                            {
-                                "type": "tool_use",
-                                "id": event["tool_use_id"],
-                                "name": event["name"],
-                                "input": event["input"],
-                            }
-                        ],
-                    }
-                )
+                messages.append({"role": "assistant", "content": [_tool_use_block(event)]})
         elif etype == "tool_result":
             messages.append(
                 {
@@ -69,31 +74,75 @@ def replay_events_to_messages(events: list[dict[str, Any]]) -> list[dict[str, An
 class SessionStore:
     """Manages JSONL session files for conversation persistence."""
 
+    CACHE_SESSIONS = 16
+    OPEN_FILES = 16
+
     def __init__(self, storage_dir: Path):
         self.storage_dir = Path(storage_dir).expanduser()
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # session_id -> (bytes parsed, events); reloads only parse lines appended since
+        self._loaded: OrderedDict[str, tuple[int, list[dict[str, Any]]]] = OrderedDict()
+        self._files: OrderedDict[str, BinaryIO] = OrderedDict()
+        atexit.register(self.close)
 
     def _path(self, session_id: str) -> Path:
         return self.storage_dir / f"{session_id}.jsonl"
 
+    def _file(self, session_id: str) -> BinaryIO:
+        """Return the session's append handle, keeping recently used sessions open."""
+        f = self._files.pop(session_id, None)
+        if f is None:
+            f = open(self._path(session_id), "ab", buffering=1 << 16)
+            if len(self._files) >= self.OPEN_FILES:
+                self._files.popitem(last=False)[1].close()
+        self._files[session_id] = f
+        return f
+
+    def _write(self, session_id: str, data: bytes) -> None:
+        f = self._file(session_id)
+        f.write(data)
+        # One write syscall per call, so readers and other processes see whole events
+        f.flush()
+
     async def append(self, session_id: str, event: dict[str, Any]) -> None:
-        event.setdefault("timestamp", time.time())
-        with open(self._path(session_id), "a", encoding="utf-8") as f:
-            f.write(json.dumps(event, default=str) + "\n")
+        self._write(session_id, orjson.dumps(stamped(event, time.time()), default=str) + b"\n")
+
+    async def append_many(self, session_id: str, events: list[dict[str, Any]]) -> None:
+        """Append several events with a single write."""
+        if not events:
+            return
+        now = time.time()
+        self._write(
+            session_id,
+            b"".join(orjson.dumps(stamped(event, now), default=str) + b"\n" for event in events),
+        )
+
+    def close(self) -> None:
+        """Close any open session files."""
+        while self._files:
+            self._files.popitem()[1].close()
 
     async def load(self, session_id: str, limit: int | None = None) -> list[dict[str, Any]]:
-        path = self._path(session_id)
-        if not path.exists():
+        try:
+            f = open(self._path(session_id), "rb")
+        except FileNotFoundError:
+            self._loaded.pop(session_id, None)
             return []
-        events = []
-        with open(path, encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    events.append(json.loads(line))
+        with f:
+            offset, events = self._loaded.pop(session_id, (0, []))
+            if os.fstat(f.fileno()).st_size < offset:
+                offset, events = 0, []  # File was replaced or truncated: start over
+            f.seek(offset)
+            data = f.read()
+        # Consume complete lines only; a partially written last line is read next time
+        end = data.rfind(b"\n") + 1
+        events.extend(orjson.loads(line) for line in data[:end].splitlines() if line.strip())
+        self._loaded[session_id] = (offset + end, events)
+        if len(self._loaded) > self.CACHE_SESSIONS:
+            self._loaded.popitem(last=False)
         if limit is not None:
             return events[-limit:]
-        return events
+        return list(events)
 
     async def exists(self, session_id: str) -> bool:
         return self._path(session_id).exists()
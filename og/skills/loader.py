@@ -2,10 +2,47 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import logging
+import os
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field, fields
+from functools import cached_property
 from pathlib import Path
 
-import frontmatter
+import orjson
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# libyaml's C loader when PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _find_skill_files(directory: str) -> Iterator[str]:
+    """Yield SKILL.md paths under ``directory``, skipping hidden directories."""
+    try:
+        it = os.scandir(directory)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            if entry.name == "SKILL.md" and entry.is_file():
+                yield entry.path
+            elif entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."):
+                yield from _find_skill_files(entry.path)
+
+
+def _split_frontmatter(text: str) -> tuple[str, str] | None:
+    """Split ``---``-delimited YAML frontmatter from the Markdown body."""
+    if not text.startswith("---"):
+        return None
+    _, _, rest = text.partition("\n")
+    block, sep, body = rest.partition("\n---")
+    if not sep:
+        return None
+    # Drop the remainder of the closing delimiter line
+    return block, body.partition("\n")[2].strip()
 
 
 @dataclass
@@ -16,48 +53,138 @@ class Skill:
     instructions: str
     path: Path = field(repr=False)
 
+    @cached_property
+    def catalog_line(self) -> str:
+        """This skill's entry in the "Available Skills" prompt section."""
+        triggers = ", ".join(f'"{t}"' for t in self.triggers)
+        return f"- **{self.name}**: {self.description} (triggers: {triggers})\n"
+
 
 class SkillRegistry:
     """Discovers and matches skills from SKILL.md files."""
 
+    # Parsed skills keyed by path, reused across processes while the file's mtime is unchanged.
+    # Stored as plain JSON fields; bump CACHE_VERSION when Skill's fields change.
+    CACHE_PATH = Path("~/.cache/og/skills.json")
+    CACHE_VERSION = 1
+
     def __init__(self, skill_dirs: list[Path] | None = None):
         self.skills: list[Skill] = []
         if skill_dirs:
+            self._cache = self._load_cache()
+            self._cache_dirty = False
             for d in skill_dirs:
                 self._discover(d)
+            if self._cache_dirty:
+                self._save_cache()
+        self._trigger_re = self._compile_triggers(self.skills)
+        self._skills_by_trigger = self._index_triggers(self.skills)
+
+    @staticmethod
+    def _compile_triggers(skills: list[Skill]) -> re.Pattern[str] | None:
+        """Compile every trigger into one pattern reporting the longest trigger at each offset."""
+        triggers = sorted({t for skill in skills for t in skill.triggers}, key=len, reverse=True)
+        if not triggers:
+            return None
+        return re.compile("(?=(" + "|".join(map(re.escape, triggers)) + "))")
+
+    @staticmethod
+    def _index_triggers(skills: list[Skill]) -> dict[str, set[int]]:
+        """Map each trigger to the indexes of skills with a trigger contained in it."""
+        triggers = {t for skill in skills for t in skill.triggers}
+        return {
+            trigger: {
+                i for i, skill in enumerate(skills) if any(t in trigger for t in skill.triggers)
+            }
+            for trigger in triggers
+        }
 
     def _discover(self, directory: Path) -> None:
         if not directory.is_dir():
             return
-        for skill_file in sorted(directory.rglob("SKILL.md")):
-            skill = self._parse(skill_file)
+        for skill_file in sorted(_find_skill_files(str(directory))):
+            skill = self._parse_cached(Path(skill_file))
             if skill:
                 self.skills.append(skill)
 
+    def _parse_cached(self, path: Path) -> Skill | None:
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return None
+        key = str(path)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        skill = self._parse(path)
+        self._cache[key] = (mtime, skill)
+        self._cache_dirty = True
+        return skill
+
+    def _load_cache(self) -> dict[str, tuple[int, Skill | None]]:
+        try:
+            data = orjson.loads(self.CACHE_PATH.expanduser().read_bytes())
+            if data.get("version") != self.CACHE_VERSION:
+                return {}
+            # Skills are rebuilt here, so entries that no longer fit Skill fail now, not later
+            return {
+                key: (mtime, Skill(path=Path(key), **skill) if skill is not None else None)
+                for key, (mtime, skill) in data["skills"].items()
+            }
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            logger.debug("Ignoring unreadable skill cache", exc_info=True)
+            return {}
+
+    def _save_cache(self) -> None:
+        path = self.CACHE_PATH.expanduser()
+        names = [f.name for f in fields(Skill) if f.name != "path"]
+        skills = {
+            key: (mtime, {n: getattr(skill, n) for n in names} if skill is not None else None)
+            for key, (mtime, skill) in self._cache.items()
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(orjson.dumps({"version": self.CACHE_VERSION, "skills": skills}))
+            os.replace(tmp, path)
+        except OSError:
+            logger.debug("Could not write skill cache", exc_info=True)
+
     @staticmethod
     def _parse(path: Path) -> Skill | None:
         try:
-            post = frontmatter.load(str(path))
+            parts = _split_frontmatter(path.read_bytes().decode("utf-8-sig").strip())
+            if parts is None:
+                return None
+            meta = yaml.load(parts[0], Loader=_YamlLoader)
         except Exception:
             return None
-        meta = post.metadata
-        if not meta.get("name") or not meta.get("triggers"):
+        if not isinstance(meta, dict) or not meta.get("name") or not meta.get("triggers"):
             return None
         return Skill(
             name=meta["name"],
             triggers=[t.lower() for t in meta["triggers"]],
             description=meta.get("description", ""),
-            instructions=post.content,
+            instructions=parts[1],
             path=path,
         )
 
+    def contains_trigger(self, message: str) -> bool:
+        """Return True if any skill trigger occurs in the message."""
+        return self._trigger_re is not None and bool(self._trigger_re.search(message.lower()))
+
     def match(self, message: str) -> list[Skill]:
-        msg_lower = message.lower()
-        matched = []
-        for skill in self.skills:
-            if any(trigger in msg_lower for trigger in skill.triggers):
-                matched.append(skill)
-        return matched
+        if self._trigger_re is None:
+            return []
+        # One scan over the message finds, at each offset, the longest trigger starting
+        # there; any shorter trigger at that offset is a substring of it and so indexed
+        hits = {m.group(1) for m in self._trigger_re.finditer(message.lower())}
+        if not hits:
+            return []
+        indexes = set().union(*(self._skills_by_trigger[t] for t in hits))
+        return [self.skills[i] for i in sorted(indexes)]
 
     def get(self, name: str) -> Skill | None:
         for skill in self.skills:
@@ -4,9 +4,11 @@
 Reads/updates ~/.claude/settings.json to add the og-context server entry.
 """
 
-import json
+import os
 from pathlib import Path
 
+import orjson
+
 SETTINGS_PATH = Path.home() / ".claude" / "settings.json"
 
 MCP_ENTRY = {
@@ -21,20 +23,23 @@ def main():
 
     settings = {}
     if SETTINGS_PATH.exists():
-        settings = json.loads(SETTINGS_PATH.read_text(encoding="utf-8"))
+        settings = orjson.loads(SETTINGS_PATH.read_bytes())
 
     mcp_servers = settings.setdefault("mcpServers", {})
 
     if "og-context" in mcp_servers:
         print(f"og-context already registered in {SETTINGS_PATH}")
-        print(f"  Current: {json.dumps(mcp_servers['og-context'])}")
+        print(f"  Current: {orjson.dumps(mcp_servers['og-context']).decode()}")
         return
 
     mcp_servers["og-context"] = MCP_ENTRY
 
-    SETTINGS_PATH.write_text(json.dumps(settings, indent=2) + "\n", encoding="utf-8")
+    # Write a sibling file and swap it in so a crash never leaves settings.json half-written
+    tmp = SETTINGS_PATH.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(settings, option=orjson.OPT_INDENT_2) + b"\n")
+    os.replace(tmp, SETTINGS_PATH)
     print(f"Registered og-context MCP server in {SETTINGS_PATH}")
-    print(f"  Entry: {json.dumps(MCP_ENTRY)}")
+    print(f"  Entry: {orjson.dumps(MCP_ENTRY).decode()}")
     print("\nRestart Claude Code to pick up the new MCP server.")
 
 
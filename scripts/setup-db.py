@@ -8,6 +8,8 @@ Usage:
     python scripts/setup-db.py              # default: localhost:5432, database 'og'
     python scripts/setup-db.py --drop       # drop and recreate everything
     python scripts/setup-db.py --check      # verify setup without modifying
+    python scripts/setup-db.py --bootstrap  # first bulk load: create an UNLOGGED staging table
+    python scripts/setup-db.py --finish-bootstrap  # swap it in and log it, then build indexes
 
 Environment:
     OG_DB__HOST          (default: localhost)
@@ -16,15 +18,27 @@ Environment:
     OG_DB__USER          (default: og)
     OG_DB__PASSWORD      (default: og)
     OG_DB__ADMIN_DSN     (default: postgresql://postgres@localhost:5432/postgres)
+    OG_DB__HNSW_M, OG_DB__HNSW_EF_CONSTRUCTION, OG_DB__HNSW_EF_SEARCH
+                         (default: tiered by context_chunks row count)
+    OG_DB__EMBEDDING_PRECISION  (default: half — halfvec; "float" for vector)
+    OG_DB__FTS_CONFIG    (default: english; "simple" for unstemmed code-heavy text)
+    OG_DB__FTS_INDEX     (default: gin; "gist" for write-heavy workloads)
+    OG_DB__SEMANTIC_INDEX  (default: full; "bit" adds the binary-quantized prefilter index)
+    OG_DB__KEYWORD_INDEX (default: tsvector; "bm25" adds the pg_search BM25 index)
+    OG_DB__MAINTENANCE_WORK_MEM  (default: 25% of RAM, for the HNSW build)
+    OG_DB__PARALLEL_WORKERS      (default: CPU count - 1, at most 7)
 """
 
 import argparse
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date
 
 import psycopg2
 from psycopg2 import sql
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -41,6 +55,55 @@ ADMIN_DSN = os.getenv(
 )
 
 EMBEDDING_DIMS = 1024  # mxbai-embed-large via Ollama
+# "half" stores fp16 halfvec (half the bytes per distance); "float" stores fp32 vector
+EMBEDDING_PRECISION = os.getenv("OG_DB__EMBEDDING_PRECISION", "half")
+EMBEDDING_TYPE = "vector" if EMBEDDING_PRECISION == "float" else "halfvec"
+
+# Keyword search: "simple" skips stemming and stop words, so it generates fewer lexemes faster
+# and keeps code identifiers intact; the agent reads the same OG_DB__FTS_CONFIG for its queries
+FTS_CONFIG = "simple" if os.getenv("OG_DB__FTS_CONFIG") == "simple" else "english"
+# GIN is faster to query; GiST is faster to build and update under write-heavy loads
+FTS_INDEX = "gist" if os.getenv("OG_DB__FTS_INDEX") == "gist" else "gin"
+# "bit" adds embedding_bit and its Hamming HNSW index for the agent's semantic_index = "bit"
+# search; the default full-precision search needs neither, so they aren't built for it
+SEMANTIC_INDEX = "bit" if os.getenv("OG_DB__SEMANTIC_INDEX") == "bit" else "full"
+# "bm25" builds the pg_search index the agent's keyword_index = "bm25" ranking reads; the
+# default tsvector ranking doesn't use it, so it isn't maintained otherwise
+KEYWORD_INDEX = "bm25" if os.getenv("OG_DB__KEYWORD_INDEX") == "bm25" else "tsvector"
+
+# Append-only logs partitioned by month on created_at: time-bounded scans prune partitions
+# and retention is a DROP TABLE instead of DELETE + VACUUM. Setup creates partitions from the
+# current month through PARTITION_MONTHS_AHEAD; later rows land in each table's default
+# partition. Rerun setup monthly (e.g. from cron) to keep partitions ahead of the data; each
+# run moves rows for newly covered months out of the default partition.
+PARTITIONED_TABLES = ("session_events", "budget_ledger")
+PARTITION_MONTHS_AHEAD = 3
+
+# HNSW graph parameters; unset values are picked by corpus size (see hnsw_params)
+HNSW_M = os.getenv("OG_DB__HNSW_M")
+HNSW_EFC = os.getenv("OG_DB__HNSW_EF_CONSTRUCTION")
+HNSW_EFSEARCH = os.getenv("OG_DB__HNSW_EF_SEARCH")
+
+# Session settings for the HNSW build: the graph builds far faster when it fits in
+# maintenance_work_mem, and pgvector builds HNSW indexes with parallel workers
+MAINTENANCE_WORK_MEM = os.getenv("OG_DB__MAINTENANCE_WORK_MEM")  # default: 25% of RAM
+PARALLEL_WORKERS = int(
+    os.getenv("OG_DB__PARALLEL_WORKERS", min(7, max(1, (os.cpu_count() or 2) - 1)))
+)
+
+# Storage parameters for context_chunks, whose recall hits update last_accessed and
+# access_count in place: free space on each page keeps those updates HOT (no new index
+# entries), and vacuuming at 5% dead rows reclaims the old versions sooner
+CHUNK_STORAGE = "fillfactor = 85, autovacuum_vacuum_scale_factor = 0.05"
+
+# (max rows, m, ef_construction, ef_search); denser graphs take fewer hops on larger corpora.
+# ef_search stays at 100+ even for small corpora: pgvector's default of 40 loses recall on
+# 1024-dim embeddings.
+HNSW_TIERS = [
+    (100_000, 16, 64, 100),
+    (1_000_000, 24, 100, 100),
+    (None, 32, 128, 200),
+]
 
 
 # ---------------------------------------------------------------------------
@@ -50,6 +113,7 @@ EMBEDDING_DIMS = 1024  # mxbai-embed-large via Ollama
 EXTENSIONS_SQL = """
 CREATE EXTENSION IF NOT EXISTS vector;
 CREATE EXTENSION IF NOT EXISTS age;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 """
 
 # Load AGE into the search path for the session so CREATE/ALTER work.
@@ -60,12 +124,12 @@ TABLES_SQL = """
 -- Context chunks: the atomic unit of stored knowledge
 -- ---------------------------------------------------------------------------
 CREATE TABLE IF NOT EXISTS context_chunks (
-    id              BIGSERIAL PRIMARY KEY,
+    id              BIGINT GENERATED ALWAYS AS IDENTITY (CACHE 100) PRIMARY KEY,
     project_id      VARCHAR(255) NOT NULL,
     chunk_type      VARCHAR(64)  NOT NULL,  -- decision, correction, constraint, fact, observation, pattern
     text            TEXT         NOT NULL,
-    embedding       vector({dims}),
-    text_search     tsvector     GENERATED ALWAYS AS (to_tsvector('english', text)) STORED,
+    embedding       {embedding_type}({dims}),  -- see EMBEDDING_PRECISION
+    text_search     tsvector     GENERATED ALWAYS AS (to_tsvector('{fts_config}', text)) STORED,
     source_session  VARCHAR(255),           -- session that produced this chunk
     source_type     VARCHAR(64),            -- pre_compact, manual, agent_extract, session_start
     created_at      TIMESTAMPTZ  NOT NULL DEFAULT now(),
@@ -73,94 +137,401 @@ CREATE TABLE IF NOT EXISTS context_chunks (
     access_count    INT          NOT NULL DEFAULT 0
 );
 
+-- Dedup key: the 16-byte md5 digest, computed once at write (older tables gain it here)
+ALTER TABLE context_chunks
+    ADD COLUMN IF NOT EXISTS text_md5 bytea GENERATED ALWAYS AS (decode(md5(text), 'hex')) STORED;
+
+-- Applies to pages written from now on (see CHUNK_STORAGE)
+ALTER TABLE context_chunks SET ({chunk_storage});
+
 -- ---------------------------------------------------------------------------
 -- Session events: replaces JSONL append-only logs
 -- ---------------------------------------------------------------------------
+-- Partitioned by month on created_at (partitions: create_partitions)
 CREATE TABLE IF NOT EXISTS session_events (
-    id              BIGSERIAL    PRIMARY KEY,
+    id              BIGSERIAL,
     session_id      VARCHAR(255) NOT NULL,
     project_id      VARCHAR(255) NOT NULL,
     event_type      VARCHAR(64)  NOT NULL,  -- session_start, user_message, assistant_message, tool_use, tool_result
     content         JSONB        NOT NULL DEFAULT '{{}}'::jsonb,
     token_count     INT,                    -- token estimate for this event
-    created_at      TIMESTAMPTZ  NOT NULL DEFAULT now()
-);
+    created_at      TIMESTAMPTZ  NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
 -- ---------------------------------------------------------------------------
 -- Budget ledger: append-only spending journal
 -- ---------------------------------------------------------------------------
+-- Partitioned by month on created_at (partitions: create_partitions)
 CREATE TABLE IF NOT EXISTS budget_ledger (
-    id              BIGSERIAL    PRIMARY KEY,
+    id              BIGSERIAL,
     project_id      VARCHAR(255) NOT NULL,
     session_id      VARCHAR(255),
     model           VARCHAR(255) NOT NULL,
     input_tokens    INT          NOT NULL DEFAULT 0,
     output_tokens   INT          NOT NULL DEFAULT 0,
     cost_usd        NUMERIC(10,6) NOT NULL,
-    created_at      TIMESTAMPTZ  NOT NULL DEFAULT now()
-);
-""".format(dims=EMBEDDING_DIMS)
+    created_at      TIMESTAMPTZ  NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
-INDEXES_SQL = """
 -- ---------------------------------------------------------------------------
--- pgvector HNSW index: semantic similarity search
+-- Budget totals: per-project running total maintained by trigger, so the
+-- tracker reads one row instead of summing the whole ledger
 -- ---------------------------------------------------------------------------
-CREATE INDEX IF NOT EXISTS idx_chunks_embedding
+CREATE TABLE IF NOT EXISTS budget_totals (
+    project_id      VARCHAR(255) PRIMARY KEY,
+    total_usd       NUMERIC(14,6) NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION budget_totals_add() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO budget_totals (project_id, total_usd)
+    VALUES (NEW.project_id, NEW.cost_usd)
+    ON CONFLICT (project_id)
+    DO UPDATE SET total_usd = budget_totals.total_usd + EXCLUDED.total_usd;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_budget_totals
+    AFTER INSERT ON budget_ledger
+    FOR EACH ROW EXECUTE FUNCTION budget_totals_add();
+
+-- Every ledger insert rewrites its project's row: leave room on each page for HOT updates.
+-- The append-only logs keep the default fillfactor of 100 (partitioned parents take none).
+ALTER TABLE budget_totals SET (fillfactor = 70);
+
+-- The partitioned logs keep BIGSERIAL (identity columns on partitioned tables need PG 17);
+-- caching sequence values per session takes the sequence off the hot insert path
+ALTER SEQUENCE IF EXISTS session_events_id_seq CACHE 100;
+ALTER SEQUENCE IF EXISTS budget_ledger_id_seq CACHE 100;
+
+-- Backfill projects whose ledger predates the trigger (no-op on re-runs)
+INSERT INTO budget_totals (project_id, total_usd)
+SELECT project_id, SUM(cost_usd) FROM budget_ledger GROUP BY project_id
+ON CONFLICT (project_id) DO NOTHING;
+""".format(
+    embedding_type=EMBEDDING_TYPE,
+    dims=EMBEDDING_DIMS,
+    fts_config=FTS_CONFIG,
+    chunk_storage=CHUNK_STORAGE,
+)
+
+# Logs created before partitioning are plain tables; create_tables copies their rows aside and
+# drops them so TABLES_SQL recreates them partitioned, then copies the rows back
+UNPARTITIONED_SQL = """
+SELECT c.relname FROM unnest(%s::text[]) AS t(name)
+JOIN pg_class c ON c.oid = to_regclass(t.name) WHERE c.relkind = 'r';
+"""
+
+# Rows copied back into budget_ledger fire trg_budget_totals a second time; recompute the totals
+BUDGET_TOTALS_SYNC_SQL = """
+INSERT INTO budget_totals (project_id, total_usd)
+SELECT project_id, SUM(cost_usd) FROM budget_ledger GROUP BY project_id
+ON CONFLICT (project_id) DO UPDATE SET total_usd = EXCLUDED.total_usd;
+"""
+
+# Existing tables keep the embedding type they were created with; convert it in place when
+# EMBEDDING_PRECISION changes. The HNSW index is built on the column's opclass, so it is
+# dropped and recreated afterwards.
+EMBEDDING_MIGRATION_SQL = """
+DO $$
+BEGIN
+    IF (SELECT atttypid::regtype::text FROM pg_attribute
+        WHERE attrelid = 'context_chunks'::regclass AND attname = 'embedding') <> '{type}' THEN
+        DROP INDEX IF EXISTS idx_chunks_embedding;
+        -- A column can't change type while a generated column reads it; BIT_COLUMN_SQL
+        -- re-adds embedding_bit afterwards when SEMANTIC_INDEX is "bit"
+        ALTER TABLE context_chunks DROP COLUMN IF EXISTS embedding_bit;
+        ALTER TABLE context_chunks
+            ALTER COLUMN embedding TYPE {type}({dims}) USING embedding::{type}({dims});
+    END IF;
+END $$;
+""".format(type=EMBEDDING_TYPE, dims=EMBEDDING_DIMS)
+
+# SEMANTIC_INDEX = "bit" only: one bit per dimension (128 bytes) for the Hamming prefilter
+BIT_COLUMN_SQL = f"""
+ALTER TABLE context_chunks
+    ADD COLUMN IF NOT EXISTS embedding_bit bit({EMBEDDING_DIMS})
+        GENERATED ALWAYS AS (binary_quantize(embedding)::bit({EMBEDDING_DIMS})) STORED;
+"""
+
+# SEMANTIC_INDEX = "bit" only: binary-quantized HNSW, a fraction of the full index's size and
+# build time; its candidates are reranked against embedding (pg.py BIT_SEMANTIC_SQL)
+BIT_INDEX_SQL = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_embedding_bit
     ON context_chunks
-    USING hnsw (embedding vector_cosine_ops)
-    WITH (m = 16, ef_construction = 200);
+    USING hnsw (embedding_bit bit_hamming_ops)
+    WITH (m = 16, ef_construction = 64);
+"""
 
--- ---------------------------------------------------------------------------
--- GIN index: full-text keyword search
--- ---------------------------------------------------------------------------
-CREATE INDEX IF NOT EXISTS idx_chunks_text_search
+# pgvector HNSW index: semantic similarity search
+HNSW_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding
     ON context_chunks
-    USING gin (text_search);
+    USING hnsw (embedding {embedding_type}_cosine_ops)
+    WITH (m = {m}, ef_construction = {efc});
+"""
 
--- ---------------------------------------------------------------------------
--- B-tree indexes: filtered queries and lookups
--- ---------------------------------------------------------------------------
-CREATE INDEX IF NOT EXISTS idx_chunks_project
+# Regenerates text_search (dropping its index with it) when FTS_CONFIG changed
+FTS_MIGRATION_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_attrdef d
+        JOIN pg_attribute a ON a.attrelid = d.adrelid AND a.attnum = d.adnum
+        WHERE d.adrelid = 'context_chunks'::regclass AND a.attname = 'text_search'
+          AND pg_get_expr(d.adbin, d.adrelid) LIKE '%''{fts_config}''%'
+    ) THEN
+        ALTER TABLE context_chunks DROP COLUMN text_search;
+        ALTER TABLE context_chunks ADD COLUMN text_search tsvector
+            GENERATED ALWAYS AS (to_tsvector('{fts_config}', text)) STORED;
+    END IF;
+END $$;
+""".format(fts_config=FTS_CONFIG)
+
+# Full-text keyword search index; GIN batches inserts in its pending list
+FTS_INDEX_SQL = {
+    "gin": """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_text_search
+    ON context_chunks
+    USING gin (text_search) WITH (fastupdate = on, gin_pending_list_limit = 4096);
+""",
+    "gist": """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_text_search
+    ON context_chunks
+    USING gist (text_search);
+""",
+}
+
+# Built with CREATE INDEX CONCURRENTLY so re-runs against a live table don't block writes.
+# CONCURRENTLY can't run inside a transaction, so each entry is a single statement; tables are
+# built in parallel, one connection each (concurrent builds on one table wait on each other).
+INDEXES_SQL = {
+    "context_chunks": [
+        # B-tree indexes: filtered queries and lookups
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_project
     ON context_chunks (project_id, created_at DESC);
-
-CREATE INDEX IF NOT EXISTS idx_chunks_type
+""",
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_type
     ON context_chunks (project_id, chunk_type);
-
-CREATE INDEX IF NOT EXISTS idx_events_session
+""",
+        # Unique index: deduplication on the stored md5 digest (replaces the md5(text)
+        # expression index uq_chunk_text)
+        """
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_chunk_text_md5
+    ON context_chunks (project_id, text_md5);
+""",
+        "DROP INDEX CONCURRENTLY IF EXISTS uq_chunk_text;",
+    ],
+    "session_events": [
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_session
     ON session_events (session_id, created_at);
-
-CREATE INDEX IF NOT EXISTS idx_events_project
+""",
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_project
     ON session_events (project_id, created_at DESC);
-
-CREATE INDEX IF NOT EXISTS idx_budget_project
+""",
+        # Per-session aggregates within a project (PgSessionStore.list_sessions)
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_project_session
+    ON session_events (project_id, session_id, created_at);
+""",
+        # GIN trigram index: substring search over session event content
+        # (PgSessionStore.search_sessions: content::text ILIKE '%...%')
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_content_trgm
+    ON session_events
+    USING gin ((content::text) gin_trgm_ops);
+""",
+        # GIN jsonb_path_ops index: containment filters on event content. Only serves the
+        # form content @> '{"name": "bash"}'::jsonb, and is ~3x smaller than jsonb_ops.
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_content
+    ON session_events
+    USING gin (content jsonb_path_ops);
+""",
+        # BRIN on created_at: append-only rows arrive in time order, so a few block-range
+        # summaries serve time-range scans at a tiny fraction of a B-tree's size
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_created_brin
+    ON session_events
+    USING brin (created_at) WITH (pages_per_range = 32);
+""",
+    ],
+    "budget_ledger": [
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_budget_project
     ON budget_ledger (project_id, created_at DESC);
+""",
+        """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_budget_created_brin
+    ON budget_ledger
+    USING brin (created_at) WITH (pages_per_range = 32);
+""",
+    ],
+}
+
+# Optional BM25 index (ParadeDB pg_search) for keyword ranking inside the index; built only
+# for KEYWORD_INDEX = "bm25", and skipped when the extension is not available.
+BM25_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_search;
+CREATE INDEX IF NOT EXISTS idx_chunks_bm25
+    ON context_chunks
+    USING bm25 (id, text, project_id)
+    WITH (key_field = 'id');
+"""
 
--- ---------------------------------------------------------------------------
--- Unique index: deduplication (functional expression index)
--- ---------------------------------------------------------------------------
-CREATE UNIQUE INDEX IF NOT EXISTS uq_chunk_text
-    ON context_chunks (project_id, md5(text));
+# First bulk load (--bootstrap): an UNLOGGED, unindexed copy of context_chunks, so COPY
+# writes no WAL and maintains no indexes. Excludes INCLUDING INDEXES, unlike INCLUDING ALL.
+BOOTSTRAP_SQL = sql.SQL("""
+CREATE UNLOGGED TABLE IF NOT EXISTS context_chunks_staging (
+    LIKE context_chunks INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING IDENTITY
+) WITH ({storage});
+GRANT ALL ON context_chunks_staging TO {user};
+""").format(storage=sql.SQL(CHUNK_STORAGE), user=sql.Identifier(DB_USER))
+
+# --finish-bootstrap: swap the loaded staging table in for the empty context_chunks, then
+# SET LOGGED (set_logged) before any index but the primary key exists, since SET LOGGED
+# rewrites the table and rebuilds its indexes. Duplicates are dropped first so
+# uq_chunk_text_md5 can be built afterwards.
+PROMOTE_SQL = """
+DELETE FROM context_chunks_staging a USING context_chunks_staging b
+WHERE a.project_id = b.project_id AND a.text_md5 = b.text_md5 AND a.id > b.id;
+DROP TABLE context_chunks;
+ALTER TABLE context_chunks_staging RENAME TO context_chunks;
+ALTER TABLE context_chunks ADD PRIMARY KEY (id);
+ANALYZE context_chunks;
 """
 
-# AGE graph setup — creates the graph and vertex/edge labels.
+# AGE graph setup — creates the graph and vertex/edge labels. One DO block: a single
+# statement, so the label DDL is parsed once and runs as one server-side call.
 GRAPH_SQL = """
-SELECT * FROM ag_catalog.create_graph('og_knowledge');
-
-SELECT * FROM ag_catalog.create_vlabel('og_knowledge', 'Decision');
-SELECT * FROM ag_catalog.create_vlabel('og_knowledge', 'Correction');
-SELECT * FROM ag_catalog.create_vlabel('og_knowledge', 'Constraint');
-SELECT * FROM ag_catalog.create_vlabel('og_knowledge', 'CodeEntity');
-SELECT * FROM ag_catalog.create_vlabel('og_knowledge', 'Session');
-SELECT * FROM ag_catalog.create_vlabel('og_knowledge', 'Pattern');
-
-SELECT * FROM ag_catalog.create_elabel('og_knowledge', 'REJECTED_IN_FAVOR_OF');
-SELECT * FROM ag_catalog.create_elabel('og_knowledge', 'DEPENDS_ON');
-SELECT * FROM ag_catalog.create_elabel('og_knowledge', 'DISCOVERED_IN');
-SELECT * FROM ag_catalog.create_elabel('og_knowledge', 'CONTRADICTS');
-SELECT * FROM ag_catalog.create_elabel('og_knowledge', 'CAUSED_BY');
-SELECT * FROM ag_catalog.create_elabel('og_knowledge', 'SUPERSEDES');
+DO $$
+BEGIN
+    PERFORM ag_catalog.create_graph('og_knowledge');
+
+    PERFORM ag_catalog.create_vlabel('og_knowledge', 'Decision');
+    PERFORM ag_catalog.create_vlabel('og_knowledge', 'Correction');
+    PERFORM ag_catalog.create_vlabel('og_knowledge', 'Constraint');
+    PERFORM ag_catalog.create_vlabel('og_knowledge', 'CodeEntity');
+    PERFORM ag_catalog.create_vlabel('og_knowledge', 'Session');
+    PERFORM ag_catalog.create_vlabel('og_knowledge', 'Pattern');
+    PERFORM ag_catalog.create_vlabel('og_knowledge', 'Fact');
+
+    PERFORM ag_catalog.create_elabel('og_knowledge', 'REJECTED_IN_FAVOR_OF');
+    PERFORM ag_catalog.create_elabel('og_knowledge', 'DEPENDS_ON');
+    PERFORM ag_catalog.create_elabel('og_knowledge', 'DISCOVERED_IN');
+    PERFORM ag_catalog.create_elabel('og_knowledge', 'CONTRADICTS');
+    PERFORM ag_catalog.create_elabel('og_knowledge', 'CAUSED_BY');
+    PERFORM ag_catalog.create_elabel('og_knowledge', 'SUPERSEDES');
+END $$;
 """
 
+# Knowledge vertex labels searched by entity/project (KnowledgeGraph.find_contradictions,
+# retrieve_related). A GIN index over each label's properties lets AGE answer the
+# {project_id: ...} property-map match by containment instead of a full label scan.
+KNOWLEDGE_LABELS = ("Decision", "Correction", "Constraint", "Pattern", "Fact")
+GRAPH_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS {index} ON og_knowledge.{table} USING gin (properties);"
+)
+
+# check_setup probes: kind -> query returning rows of (name, present, detail). Each runs on
+# its own, so one failing probe (e.g. ag_catalog without AGE) doesn't hide the others.
+CHECK_EXTENSIONS = ("age", "pg_trgm", "vector")
+CHECK_TABLES = ("budget_ledger", "budget_totals", "context_chunks", "session_events")
+CHECK_HNSW_INDEX = "idx_chunks_embedding"
+CHECK_EVENT_INDEXES = ("idx_events_content", "idx_events_content_trgm")
+CHECK_SQL = {
+    "extension": """
+SELECT e.name, EXISTS (SELECT 1 FROM pg_extension WHERE extname = e.name), NULL
+FROM unnest(%(extensions)s::text[]) AS e(name)
+""",
+    "table": """
+SELECT t.name, c.oid IS NOT NULL, c.relkind::text
+FROM unnest(%(tables)s::text[]) AS t(name)
+LEFT JOIN pg_class c ON c.oid = to_regclass('public.' || t.name)
+""",
+    "partition": """
+SELECT p.name, to_regclass(p.name) IS NOT NULL, NULL
+FROM unnest(%(partitions)s::text[]) AS p(name)
+""",
+    "hnsw": """
+SELECT %(hnsw)s, EXISTS (
+    SELECT 1 FROM pg_indexes
+    WHERE tablename = 'context_chunks' AND indexname = %(hnsw)s AND indexdef LIKE '%%hnsw%%'
+), NULL
+""",
+    "index": """
+SELECT i.name,
+       EXISTS (SELECT 1 FROM pg_indexes WHERE tablename = 'session_events' AND indexname = i.name),
+       NULL
+FROM unnest(%(indexes)s::text[]) AS i(name)
+""",
+    "graph": """
+SELECT 'og_knowledge', EXISTS (SELECT 1 FROM ag_catalog.ag_graph WHERE name = 'og_knowledge'), NULL
+""",
+    "column": """
+SELECT 'text_md5', EXISTS (
+    SELECT 1 FROM pg_attribute
+    WHERE attrelid = to_regclass('public.context_chunks') AND attname = 'text_md5'
+      AND attgenerated = 's'
+), NULL
+""",
+    "embedding": """
+SELECT t.typname, t.typname IN ('vector', 'halfvec'), a.atttypmod::text
+FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid
+WHERE a.attrelid = to_regclass('public.context_chunks') AND a.attname = 'embedding'
+""",
+}
+
+# True when grant_permissions would change nothing: the role already holds each privilege
+# its GRANT ALLs give. A has_*_privilege list is true if ANY privilege is held, so each is
+# checked on its own.
+GRANTED_SQL = """
+SELECT has_schema_privilege(%(role)s, 'ag_catalog', 'CREATE')
+   AND has_schema_privilege(%(role)s, 'og_knowledge', 'USAGE')
+   AND has_schema_privilege(%(role)s, 'og_knowledge', 'CREATE')
+   AND NOT EXISTS (
+       SELECT 1 FROM pg_class c
+       JOIN pg_namespace n ON n.oid = c.relnamespace
+       CROSS JOIN unnest(
+           CASE WHEN c.relkind = 'S' THEN ARRAY['SELECT', 'UPDATE']
+           ELSE ARRAY['SELECT', 'INSERT', 'UPDATE', 'DELETE', 'TRUNCATE', 'REFERENCES', 'TRIGGER']
+           END
+       ) AS p(privilege)
+       WHERE ((c.relkind IN ('r', 'p', 'v', 'm')
+               AND n.nspname IN ('public', 'ag_catalog', 'og_knowledge'))
+              OR (c.relkind = 'S' AND n.nspname = 'public'))
+         AND NOT has_table_privilege(%(role)s, c.oid, p.privilege)
+   );
+"""
+
+# Grants to the OG role, composed once at import with the role name quoted as an
+# identifier (as create_role_and_database creates it)
+AG_CATALOG_GRANT_SQL = sql.SQL("GRANT USAGE ON SCHEMA ag_catalog TO {user};").format(
+    user=sql.Identifier(DB_USER)
+)
+PARADEDB_GRANT_SQL = sql.SQL("GRANT USAGE ON SCHEMA paradedb TO {user};").format(
+    user=sql.Identifier(DB_USER)
+)
+GRANTS_SQL = sql.SQL("""
+GRANT ALL ON ALL TABLES IN SCHEMA public TO {user};
+GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO {user};
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO {user};
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON SEQUENCES TO {user};
+-- AGE schema access
+GRANT ALL ON SCHEMA ag_catalog TO {user};
+GRANT ALL ON ALL TABLES IN SCHEMA ag_catalog TO {user};
+-- AGE graph schema — each graph creates its own schema
+GRANT ALL ON SCHEMA og_knowledge TO {user};
+GRANT ALL ON ALL TABLES IN SCHEMA og_knowledge TO {user};
+""").format(user=sql.Identifier(DB_USER))
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -169,7 +540,7 @@ SELECT * FROM ag_catalog.create_elabel('og_knowledge', 'SUPERSEDES');
 def connect_admin():
     """Connect to the admin database (postgres) for CREATE DATABASE."""
     conn = psycopg2.connect(ADMIN_DSN)
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    conn.autocommit = True
     return conn
 
 
@@ -200,6 +571,61 @@ def role_exists(cur):
     return cur.fetchone() is not None
 
 
+def hnsw_params(vector_count):
+    """Return (m, ef_construction, ef_search) for a corpus size, with env overrides applied."""
+    for max_rows, m, efc, ef_search in HNSW_TIERS:
+        if max_rows is None or vector_count < max_rows:
+            break
+    return (
+        int(HNSW_M or m),
+        int(HNSW_EFC or efc),
+        int(HNSW_EFSEARCH or ef_search),
+    )
+
+
+def maintenance_work_mem():
+    """Return the HNSW build's maintenance_work_mem: the env override or 25% of RAM.
+
+    RAM is measured on this machine, which is the database host for the default
+    localhost setup; set OG_DB__MAINTENANCE_WORK_MEM when the server is remote.
+    """
+    if MAINTENANCE_WORK_MEM:
+        return MAINTENANCE_WORK_MEM
+    try:
+        ram = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return "1GB"
+    return f"{max(64, ram // 4 // 2**20)}MB"
+
+
+def chunk_count(cur):
+    """Estimated context_chunks row count (reltuples is -1 or 0 until first analyzed)."""
+    cur.execute("SELECT reltuples FROM pg_class WHERE oid = 'context_chunks'::regclass")
+    return max(0, int(cur.fetchone()[0]))
+
+
+def vector_version(cur):
+    cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    row = cur.fetchone()
+    return tuple(int(part) for part in row[0].split(".")) if row else ()
+
+
+def is_partitioned(cur, table):
+    cur.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cur.fetchone()
+    return bool(row and row[0])
+
+
+def add_months(month, n):
+    """Return the first day of the month ``n`` months after ``month``."""
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_y{month:%Y}m{month:%m}"
+
+
 def graph_exists(cur):
     cur.execute(
         "SELECT 1 FROM ag_catalog.ag_graph WHERE name = %s", ("og_knowledge",)
@@ -207,6 +633,18 @@ def graph_exists(cur):
     return cur.fetchone() is not None
 
 
+def existing_labels(cur):
+    cur.execute(
+        """
+        SELECT l.name FROM ag_catalog.ag_label l
+        JOIN ag_catalog.ag_graph g ON l.graph = g.graphid
+        WHERE g.name = %s
+        """,
+        ("og_knowledge",),
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
 def print_ok(msg):
     print(f"  \033[32m✓\033[0m {msg}")
 
@@ -263,103 +701,350 @@ def create_role_and_database(drop=False):
     conn.close()
 
 
-def create_extensions():
-    """Enable pgvector and AGE extensions (requires superuser on the OG database)."""
+def create_extensions(conn):
+    """Enable pgvector, AGE and pg_trgm extensions (requires superuser on the OG database).
+
+    Returns False if the installed pgvector can't store the configured embedding types.
+    """
     print("\n2. Extensions")
-    conn = connect_og_admin()
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    # Autocommit for the extensions only; the later steps run and commit their own transactions
+    conn.autocommit = True
     cur = conn.cursor()
 
-    for line in EXTENSIONS_SQL.strip().split("\n"):
-        line = line.strip()
-        if line and not line.startswith("--"):
-            cur.execute(line)
-            ext = line.split("EXISTS")[-1].strip().rstrip(";")
-            print_ok(f"Extension {ext}")
-
-    # Grant AGE schema usage to our role
-    cur.execute(f"GRANT USAGE ON SCHEMA ag_catalog TO {DB_USER};")
+    # One round trip for the extensions and the AGE schema grant to our role
+    cur.execute(sql.SQL(EXTENSIONS_SQL) + AG_CATALOG_GRANT_SQL)
+    for ext in re.findall(r"CREATE EXTENSION IF NOT EXISTS (\w+)", EXTENSIONS_SQL):
+        print_ok(f"Extension {ext}")
     print_ok(f"Granted ag_catalog usage to '{DB_USER}'")
 
+    # halfvec, binary_quantize and bit_hamming_ops arrived in pgvector 0.7
+    version = vector_version(cur)
     cur.close()
-    conn.close()
+    conn.autocommit = False
+    if (EMBEDDING_TYPE == "halfvec" or SEMANTIC_INDEX == "bit") and version < (0, 7):
+        print_err(
+            f"pgvector {'.'.join(map(str, version))} is too old for halfvec/bit (needs 0.7+): "
+            "run ALTER EXTENSION vector UPDATE, or set OG_DB__EMBEDDING_PRECISION=float "
+            "and unset OG_DB__SEMANTIC_INDEX"
+        )
+        return False
+    return True
 
 
-def create_tables():
+def create_tables(conn):
     """Create relational tables."""
     print("\n3. Tables")
-    conn = connect_og_admin()
     cur = conn.cursor()
-    cur.execute(TABLES_SQL)
-    conn.commit()
-    print_ok("context_chunks")
+    cur.execute(UNPARTITIONED_SQL, (list(PARTITIONED_TABLES),))
+    unpartitioned = [row[0] for row in cur.fetchall()]
+    for table in unpartitioned:
+        print_info(f"{table} predates partitioning; migrating its rows to a partitioned table")
+        stash_rows(cur, sql.Identifier(table), f"{table}_rows")
+        cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(table)))
+    cur.execute(
+        "SELECT atttypid::regtype::text FROM pg_attribute "
+        "WHERE attrelid = to_regclass('context_chunks') AND attname = 'embedding'"
+    )
+    row = cur.fetchone()
+    if row and row[0] != EMBEDDING_TYPE:
+        keep = "float" if row[0] == "vector" else "half"
+        print_info(
+            f"Converting context_chunks.embedding from {row[0]} to {EMBEDDING_TYPE}; this "
+            f"rewrites the table (set OG_DB__EMBEDDING_PRECISION={keep} to keep {row[0]})"
+        )
+    cur.execute(TABLES_SQL + EMBEDDING_MIGRATION_SQL + FTS_MIGRATION_SQL)
+    print_ok(f"context_chunks (embedding {EMBEDDING_TYPE}({EMBEDDING_DIMS}))")
+    if SEMANTIC_INDEX == "bit":
+        cur.execute(BIT_COLUMN_SQL)
+        print_ok(f"context_chunks.embedding_bit (bit({EMBEDDING_DIMS}))")
     print_ok("session_events")
     print_ok("budget_ledger")
+    print_ok("budget_totals (+ trg_budget_totals)")
+    create_partitions(cur)
+    for table in unpartitioned:
+        restore_rows(cur, table, f"{table}_rows")
+        cur.execute(
+            sql.SQL("SELECT setval(pg_get_serial_sequence(%s, 'id'), max(id)) FROM {}").format(
+                sql.Identifier(table)
+            ),
+            (table,),
+        )
+        print_ok(f"{table}: rows migrated")
+    conn.commit()
     cur.close()
-    conn.close()
 
 
-def create_indexes():
+def create_partitions(cur, months_ahead=PARTITION_MONTHS_AHEAD):
+    """Create monthly partitions from the current month through ``months_ahead`` months out."""
+    this_month = date.today().replace(day=1)
+    last_month = add_months(this_month, months_ahead)
+    months = [add_months(this_month, i) for i in range(months_ahead + 1)]
+    statements = []
+    moved = []
+    for table in PARTITIONED_TABLES:
+        default = sql.Identifier(f"{table}_default")
+        cur.execute(
+            sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} DEFAULT").format(
+                default, sql.Identifier(table)
+            )
+        )
+        # A month can't be split out while the default partition holds rows from it: those
+        # rows are set aside, then copied into the new partition. One query probes every month
+        cur.execute(
+            sql.SQL(
+                "SELECT m FROM unnest(%s::date[]) AS m WHERE EXISTS (SELECT 1 FROM {} "
+                "WHERE created_at >= m AND created_at < m + interval '1 month')"
+            ).format(default),
+            (months,),
+        )
+        occupied = {row[0] for row in cur.fetchall()}
+        for start in months:
+            if start in occupied:
+                rows = f"{partition_name(table, start)}_rows"
+                month = sql.SQL("created_at >= {} AND created_at < {}").format(
+                    sql.Literal(start), sql.Literal(add_months(start, 1))
+                )
+                stash_rows(cur, default, rows, month)
+                cur.execute(sql.SQL("DELETE FROM {} WHERE {}").format(default, month))
+                moved.append((table, rows))
+                print_info(f"{table}: moving {start:%Y-%m} rows out of {table}_default")
+            statements.append(
+                sql.SQL(
+                    "CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM ({}) TO ({});"
+                ).format(
+                    sql.Identifier(partition_name(table, start)),
+                    sql.Identifier(table),
+                    sql.Literal(start),
+                    sql.Literal(add_months(start, 1)),
+                )
+            )
+        print_ok(f"{table} partitions: {this_month:%Y-%m} through {last_month:%Y-%m} + default")
+    # Every monthly partition in one execute
+    if statements:
+        cur.execute(sql.SQL("\n").join(statements))
+    for table, rows in moved:
+        restore_rows(cur, table, rows)
+
+
+def stash_rows(cur, source, rows, where=None):
+    """Copy the rows of ``source`` (those matching ``where``, if given) into temp table ``rows``."""
+    cur.execute(
+        sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT * FROM {} WHERE {}").format(
+            sql.Identifier(rows), source, where or sql.SQL("true")
+        )
+    )
+
+
+def restore_rows(cur, table, rows):
+    """Insert the rows stashed in ``rows`` into ``table``, routed to its partitions."""
+    cur.execute(sql.SQL("SELECT * FROM {} LIMIT 0").format(sql.Identifier(rows)))
+    columns = sql.SQL(", ").join(sql.Identifier(c.name) for c in cur.description)
+    cur.execute(
+        sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+            sql.Identifier(table), columns, columns, sql.Identifier(rows)
+        )
+    )
+    if table == "budget_ledger":
+        cur.execute(BUDGET_TOTALS_SYNC_SQL)
+
+
+def create_bootstrap_tables(conn):
+    """Create the UNLOGGED staging table for a first-time bulk load of context chunks.
+
+    Loading it unindexed, then logging it and building the HNSW index once, is cheaper than
+    inserting into the indexed table. For later, incremental loads, run several concurrent
+    INSERT/COPY sessions into context_chunks instead: index inserts from separate backends
+    overlap.
+    """
+    print("\n4. Bootstrap staging table")
+    cur = conn.cursor()
+    cur.execute(BOOTSTRAP_SQL)
+    conn.commit()
+    cur.close()
+    print_ok("context_chunks_staging (UNLOGGED, no indexes)")
+    print_info(
+        "COPY context_chunks_staging (project_id, chunk_type, text, embedding, ...) FROM STDIN"
+    )
+    print_info("Then rerun with --finish-bootstrap to swap it in and build the indexes")
+
+
+def promote_bootstrap_table(conn):
+    """Replace the empty context_chunks with the loaded staging table; False if it can't."""
+    print("\n3b. Promote bootstrap table")
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT to_regclass('context_chunks_staging') IS NOT NULL,"
+        " EXISTS (SELECT 1 FROM context_chunks)"
+    )
+    staged, populated = cur.fetchone()
+    if not staged:
+        print_err("context_chunks_staging NOT found (run with --bootstrap and load it first)")
+    elif populated:
+        print_err("context_chunks already has rows; bootstrap only replaces an empty table")
+    else:
+        cur.execute(PROMOTE_SQL)
+        conn.commit()
+        print_ok("context_chunks_staging renamed to context_chunks")
+    cur.close()
+    return staged and not populated
+
+
+def set_logged(conn):
+    """WAL-log the promoted table, making it crash-safe, before its indexes are built.
+
+    SET LOGGED rewrites the heap and rebuilds every index, so running it first keeps the
+    HNSW build to one pass.
+    """
+    cur = conn.cursor()
+    cur.execute("ALTER TABLE context_chunks SET LOGGED")
+    conn.commit()
+    cur.close()
+    print_ok("context_chunks SET LOGGED")
+
+
+def create_indexes(conn):
     """Create HNSW, GIN, and B-tree indexes."""
     print("\n4. Indexes")
-    conn = connect_og_admin()
     cur = conn.cursor()
-    cur.execute(INDEXES_SQL)
+    m, efc, _ = hnsw_params(chunk_count(cur))
+    work_mem = maintenance_work_mem()
+    # SET LOCAL scopes these to the index build's own transaction
+    cur.execute("SET LOCAL maintenance_work_mem = %s", (work_mem,))
+    cur.execute("SET LOCAL max_parallel_maintenance_workers = %s", (PARALLEL_WORKERS,))
+    cur.execute("SET LOCAL max_parallel_workers = %s", (PARALLEL_WORKERS + 1,))
+    cur.execute(HNSW_INDEX_SQL.format(embedding_type=EMBEDDING_TYPE, m=m, efc=efc))
     conn.commit()
-    print_ok("idx_chunks_embedding (HNSW, cosine, m=16, ef_construction=200)")
-    print_ok("idx_chunks_text_search (GIN, tsvector)")
+    groups = dict(INDEXES_SQL)
+    groups["context_chunks"] = [FTS_INDEX_SQL[FTS_INDEX], *groups["context_chunks"]]
+    if SEMANTIC_INDEX == "bit":
+        groups["context_chunks"].append(BIT_INDEX_SQL)
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        list(executor.map(build_table_indexes, groups, groups.values()))
+    print_ok(f"idx_chunks_embedding (HNSW, {EMBEDDING_TYPE} cosine, m={m}, ef_construction={efc})")
+    print_info(f"Built with maintenance_work_mem={work_mem}, {PARALLEL_WORKERS} parallel workers")
+    print_ok(f"idx_chunks_text_search ({FTS_INDEX.upper()}, tsvector, '{FTS_CONFIG}')")
     print_ok("idx_chunks_project, idx_chunks_type (B-tree)")
-    print_ok("idx_events_session, idx_events_project (B-tree)")
+    print_ok("idx_events_session, idx_events_project, idx_events_project_session (B-tree)")
     print_ok("idx_budget_project (B-tree)")
+    print_ok("idx_events_created_brin, idx_budget_created_brin (BRIN, created_at)")
+    print_ok("uq_chunk_text_md5 (unique, project_id + text_md5)")
+    if SEMANTIC_INDEX == "bit":
+        print_ok("idx_chunks_embedding_bit (HNSW, bit Hamming, m=16, ef_construction=64)")
+    print_ok("idx_events_content_trgm (GIN, pg_trgm)")
+    print_ok("idx_events_content (GIN, jsonb_path_ops)")
+
+    if KEYWORD_INDEX == "bm25":
+        try:
+            cur.execute(BM25_SQL)
+            cur.execute(PARADEDB_GRANT_SQL)
+            conn.commit()
+            print_ok("idx_chunks_bm25 (BM25, pg_search)")
+        except psycopg2.Error:
+            conn.rollback()
+            print_err("pg_search not available; set OG_DB__KEYWORD_INDEX=tsvector for the agent")
+    cur.close()
+
+
+def build_table_indexes(table, statements):
+    """Run one table's CREATE INDEX CONCURRENTLY statements on a dedicated connection.
+
+    Partitioned tables don't support CONCURRENTLY, so their indexes are built plainly.
+    """
+    with closing(connect_og_admin()) as conn:
+        conn.autocommit = True
+        cur = conn.cursor()
+        partitioned = is_partitioned(cur, table)
+        # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+        cur.execute(
+            "SELECT indexrelid::regclass::text FROM pg_index "
+            "WHERE indrelid = %s::regclass AND NOT indisvalid",
+            (table,),
+        )
+        for (index,) in cur.fetchall():
+            cur.execute(f"DROP INDEX {'' if partitioned else 'CONCURRENTLY '}IF EXISTS {index};")
+        for statement in statements:
+            if partitioned:
+                statement = statement.replace(" CONCURRENTLY", "")
+            cur.execute(statement)
+        cur.close()
+
+
+def configure_db_defaults(conn):
+    """Persist query-time pgvector settings on the database so every connection inherits them."""
+    print("\n5. Database defaults")
+    cur = conn.cursor()
+    _, _, ef_search = hnsw_params(chunk_count(cur))
+    settings = {"hnsw.ef_search": ef_search}
+    if vector_version(cur) >= (0, 8):
+        # Keep scanning the HNSW graph until enough rows pass the project_id filter;
+        # SEMANTIC_SQL re-sorts the relaxed results by distance
+        settings["hnsw.iterative_scan"] = "relaxed_order"
+    for name, value in settings.items():
+        cur.execute(
+            sql.SQL("ALTER DATABASE {} SET {} = {}").format(
+                sql.Identifier(DB_NAME), sql.SQL(name), sql.Literal(value)
+            )
+        )
+        print_ok(f"{name} = {value} for database '{DB_NAME}'")
+    conn.commit()
     cur.close()
-    conn.close()
 
 
-def create_graph():
+def create_graph(conn):
     """Create the AGE knowledge graph with vertex and edge labels."""
-    print("\n5. Knowledge graph (Apache AGE)")
-    conn = connect_og_admin()
+    print("\n6. Knowledge graph (Apache AGE)")
     cur = conn.cursor()
     cur.execute(AGE_SEARCH_PATH)
 
     if graph_exists(cur):
         print_skip("Graph 'og_knowledge'")
-        cur.close()
-        conn.close()
-        return
-
-    for statement in GRAPH_SQL.strip().split("\n"):
-        statement = statement.strip()
-        if statement and not statement.startswith("--"):
-            cur.execute(statement)
-
+    else:
+        cur.execute(GRAPH_SQL)
+        conn.commit()
+        print_ok("Graph 'og_knowledge'")
+        print_ok(
+            "Vertex labels: Decision, Correction, Constraint, CodeEntity, Session, Pattern, Fact"
+        )
+        print_ok("Edge labels: REJECTED_IN_FAVOR_OF, DEPENDS_ON, DISCOVERED_IN, CONTRADICTS, CAUSED_BY, SUPERSEDES")
+
+    # Property indexes (also added to graphs created before they existed), in one execute
+    existing = existing_labels(cur)
+    statements = []
+    for label in KNOWLEDGE_LABELS:
+        if label not in existing:
+            statements.append(
+                sql.SQL("SELECT * FROM ag_catalog.create_vlabel('og_knowledge', {});").format(
+                    sql.Literal(label)
+                )
+            )
+        statements.append(
+            sql.SQL(GRAPH_INDEX_SQL).format(
+                index=sql.Identifier(f"idx_kg_{label.lower()}_props"),
+                table=sql.Identifier(label),
+            )
+        )
+    cur.execute(sql.SQL("\n").join(statements))
     conn.commit()
-    print_ok("Graph 'og_knowledge'")
-    print_ok("Vertex labels: Decision, Correction, Constraint, CodeEntity, Session, Pattern")
-    print_ok("Edge labels: REJECTED_IN_FAVOR_OF, DEPENDS_ON, DISCOVERED_IN, CONTRADICTS, CAUSED_BY, SUPERSEDES")
+    print_ok("Vertex property indexes (GIN): " + ", ".join(KNOWLEDGE_LABELS))
     cur.close()
-    conn.close()
 
 
-def grant_permissions():
+def grant_permissions(conn):
     """Grant the OG role full access to all tables and sequences."""
-    print("\n6. Permissions")
-    conn = connect_og_admin()
+    print("\n7. Permissions")
     cur = conn.cursor()
-    cur.execute(f"GRANT ALL ON ALL TABLES IN SCHEMA public TO {DB_USER};")
-    cur.execute(f"GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO {DB_USER};")
-    cur.execute(f"ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO {DB_USER};")
-    cur.execute(f"ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON SEQUENCES TO {DB_USER};")
-    # AGE schema access
-    cur.execute(f"GRANT ALL ON SCHEMA ag_catalog TO {DB_USER};")
-    cur.execute(f"GRANT ALL ON ALL TABLES IN SCHEMA ag_catalog TO {DB_USER};")
-    # AGE graph schema — each graph creates its own schema
-    cur.execute(f"GRANT ALL ON SCHEMA og_knowledge TO {DB_USER};")
-    cur.execute(f"GRANT ALL ON ALL TABLES IN SCHEMA og_knowledge TO {DB_USER};")
+    # A rerun skips the grants, each of which rescans every table in its schema
+    cur.execute(GRANTED_SQL, {"role": DB_USER})
+    if cur.fetchone()[0]:
+        conn.rollback()
+        print_skip(f"Full access for role '{DB_USER}'")
+        cur.close()
+        return
+    # Sent as one multi-statement string: a single round trip, committed as one transaction
+    cur.execute(GRANTS_SQL)
     conn.commit()
     print_ok(f"Granted full access to role '{DB_USER}'")
     cur.close()
-    conn.close()
 
 
 def check_setup():
@@ -375,65 +1060,101 @@ def check_setup():
         print_err(f"Cannot connect: {e}")
         return False
 
+    # Autocommit: a failed probe must not abort the transaction the others run in
+    conn.autocommit = True
     cur = conn.cursor()
-
-    # 2. Extensions
-    cur.execute("SELECT extname FROM pg_extension WHERE extname IN ('vector', 'age') ORDER BY extname")
-    exts = [row[0] for row in cur.fetchall()]
-    for ext in ("age", "vector"):
-        if ext in exts:
-            print_ok(f"Extension '{ext}' installed")
+    this_month = date.today().replace(day=1)
+    params = {
+        "extensions": list(CHECK_EXTENSIONS),
+        "tables": list(CHECK_TABLES),
+        "partitions": [partition_name(t, this_month) for t in PARTITIONED_TABLES],
+        "hnsw": CHECK_HNSW_INDEX,
+        "indexes": list(CHECK_EVENT_INDEXES),
+    }
+    # kind -> name -> (present, detail); a probe that fails leaves its kind empty, so its
+    # checks below report as missing
+    results = {}
+    for kind, query in CHECK_SQL.items():
+        results[kind] = {}
+        try:
+            cur.execute(query, params)
+        except psycopg2.Error as e:
+            print_err(f"Check '{kind}' failed: {e}".strip())
+            continue
+        for name, present, detail in cur.fetchall():
+            results[kind][name] = (present, detail)
+    missing = (False, None)
+
+    def report(ok, ok_msg, err_msg):
+        nonlocal errors
+        if ok:
+            print_ok(ok_msg)
         else:
-            print_err(f"Extension '{ext}' NOT installed")
+            print_err(err_msg)
             errors += 1
 
-    # 3. Tables
-    cur.execute("""
-        SELECT tablename FROM pg_tables
-        WHERE schemaname = 'public'
-        AND tablename IN ('context_chunks', 'session_events', 'budget_ledger')
-        ORDER BY tablename
-    """)
-    tables = [row[0] for row in cur.fetchall()]
-    for t in ("budget_ledger", "context_chunks", "session_events"):
-        if t in tables:
-            print_ok(f"Table '{t}'")
-        else:
-            print_err(f"Table '{t}' NOT found")
-            errors += 1
+    # 2. Extensions
+    for name in CHECK_EXTENSIONS:
+        present, _ = results["extension"].get(name, missing)
+        report(present, f"Extension '{name}' installed", f"Extension '{name}' NOT installed")
+
+    # 3. Tables (detail is pg_class.relkind)
+    for name in CHECK_TABLES:
+        present, _ = results["table"].get(name, missing)
+        report(present, f"Table '{name}'", f"Table '{name}' NOT found")
+
+    # 3b. Current-month partitions
+    for table in PARTITIONED_TABLES:
+        if results["table"].get(table, missing)[1] != "p":
+            print_info(f"Table '{table}' is not partitioned")
+            continue
+        name = partition_name(table, this_month)
+        present, _ = results["partition"].get(name, missing)
+        report(
+            present,
+            f"Partition '{name}'",
+            f"Partition '{name}' NOT found (rerun setup to create it)",
+        )
 
     # 4. HNSW index
-    cur.execute("""
-        SELECT indexname, indexdef FROM pg_indexes
-        WHERE tablename = 'context_chunks' AND indexdef LIKE '%hnsw%'
-    """)
-    hnsw = cur.fetchall()
-    if hnsw:
-        print_ok(f"HNSW index: {hnsw[0][0]}")
-    else:
-        print_err("HNSW index NOT found on context_chunks.embedding")
-        errors += 1
+    present, _ = results["hnsw"].get(CHECK_HNSW_INDEX, missing)
+    report(
+        present,
+        f"HNSW index: {CHECK_HNSW_INDEX}",
+        f"HNSW index '{CHECK_HNSW_INDEX}' NOT found on context_chunks.embedding",
+    )
+
+    # 4b. Session event content indexes
+    for name in CHECK_EVENT_INDEXES:
+        present, _ = results["index"].get(name, missing)
+        report(present, f"Index '{name}'", f"Index '{name}' NOT found on session_events")
 
     # 5. AGE graph
-    cur.execute(AGE_SEARCH_PATH)
-    if graph_exists(cur):
-        print_ok("Graph 'og_knowledge'")
-    else:
-        print_err("Graph 'og_knowledge' NOT found")
-        errors += 1
+    present, _ = results["graph"].get("og_knowledge", missing)
+    report(present, "Graph 'og_knowledge'", "Graph 'og_knowledge' NOT found")
+
+    # 6. Dedup key column
+    present, _ = results["column"].get("text_md5", missing)
+    report(
+        present,
+        "Generated column: context_chunks.text_md5",
+        "Generated column context_chunks.text_md5 NOT found",
+    )
 
-    # 6. Embedding dimension check
-    cur.execute("""
-        SELECT atttypmod FROM pg_attribute
-        WHERE attrelid = 'context_chunks'::regclass AND attname = 'embedding'
-    """)
-    row = cur.fetchone()
-    if row:
-        dims = row[0]
-        print_ok(f"Embedding column: vector({dims})")
-    else:
+    # 7. Embedding type and dimensions (detail is atttypmod)
+    embedding = results["embedding"]
+    if not embedding:
         print_err("Embedding column NOT found")
         errors += 1
+    else:
+        [(typname, (supported, dims))] = embedding.items()
+        report(
+            supported,
+            f"Embedding column: {typname}({dims})",
+            f"Embedding column has unsupported type '{typname}'",
+        )
+        if supported and typname != EMBEDDING_TYPE:
+            print_info(f"Configured precision expects {EMBEDDING_TYPE}; rerun setup to convert")
 
     cur.close()
     conn.close()
@@ -454,11 +1175,22 @@ def main():
     parser = argparse.ArgumentParser(description="Set up the OG context store database.")
     parser.add_argument("--drop", action="store_true", help="Drop and recreate the database")
     parser.add_argument("--check", action="store_true", help="Verify setup without modifying")
+    bootstrap = parser.add_mutually_exclusive_group()
+    bootstrap.add_argument(
+        "--bootstrap",
+        action="store_true",
+        help="Create an UNLOGGED staging table for a first bulk load, skipping the indexes",
+    )
+    bootstrap.add_argument(
+        "--finish-bootstrap",
+        action="store_true",
+        help="Swap the loaded staging table in and log it, then build the indexes",
+    )
     args = parser.parse_args()
 
     print("OG Context Store — Database Setup")
     print(f"  Target: {DB_HOST}:{DB_PORT}/{DB_NAME} (role: {DB_USER})")
-    print(f"  Embedding: vector({EMBEDDING_DIMS}) — mxbai-embed-large via Ollama")
+    print(f"  Embedding: {EMBEDDING_TYPE}({EMBEDDING_DIMS}) — mxbai-embed-large via Ollama")
 
     if args.check:
         ok = check_setup()
@@ -466,11 +1198,22 @@ def main():
 
     try:
         create_role_and_database(drop=args.drop)
-        create_extensions()
-        create_tables()
-        create_indexes()
-        create_graph()
-        grant_permissions()
+        # One admin connection to the OG database for every remaining step
+        with closing(connect_og_admin()) as conn:
+            if not create_extensions(conn):
+                sys.exit(1)
+            create_tables(conn)
+            if args.bootstrap:
+                create_bootstrap_tables(conn)
+                return
+            if args.finish_bootstrap:
+                if not promote_bootstrap_table(conn):
+                    sys.exit(1)
+                set_logged(conn)
+            create_indexes(conn)
+            configure_db_defaults(conn)
+            create_graph(conn)
+            grant_permissions(conn)
         print("\n" + "=" * 50)
         check_setup()
     except psycopg2.OperationalError as e: